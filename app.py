@@ -9,7 +9,9 @@ from components import (
     university_rankings,
     new_publications,
     collaboration_viewer,
+    expertise_search,
 )
+from services import connection_settings, image_proxy, result_cache, search_index, warmup
 
 custom_css = "static/custom_theme.css"
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.FLATLY, custom_css])
@@ -44,6 +46,7 @@ tabs_info = [
     {"label": "Collaboration Viewer", "component": collaboration_viewer},
     {"label": "Top Keywords", "component": top_keywords},
     {"label": "Keyword Trends", "component": keyword_trends},
+    {"label": "Expertise Search", "component": expertise_search},
 ]
 
 # Generate tabs using the create_tab function and list of dictionaries
@@ -76,5 +79,16 @@ app.layout = html.Div(
 for tab in tabs_info:
     tab["component"].register_callbacks(app)
 
+# Serve external faculty photos and university logos through the local thumbnail cache
+image_proxy.register_routes(app.server)
+# Expose hit/miss counters of the chart result cache at /cache-stats
+result_cache.register_routes(app.server)
+# Expose live connection pool utilisation of all three databases at /pool-stats
+connection_settings.register_routes(app.server)
+
+# Load dropdown reference data concurrently in the background so importing the app never waits on a database
+warmup.register('search_index', search_index.ensure_synced)
+warmup.start()
+
 if __name__ == "__main__":
     app.run_server(debug=False)
@@ -1,9 +1,17 @@
 import dash_bootstrap_components as dbc
-import pandas as pd
+import plotly.graph_objects as go
 
-from dash import dcc, html, Input, Output
-from services.mysql_service import mysql_engine
-from sqlalchemy import text
+from dash import callback_context, dash_table, dcc, html, Input, Output, State, no_update
+from services import job_service, reference_cache, search_index
+from services.collaboration_network import MAX_HOPS, expand_network
+from services.coauthor_service import get_coauthor_set, select_coauthors
+from services.table_query import sort_and_filter_frame
+
+# Co-author rows sent to the browser per page of the table
+PAGE_SIZE = 25
+
+COAUTHOR_COLUMNS = [('#', '#'), ('Faculty1', 'Faculty'), ('Faculty2', 'Co-Author'), ('University', 'University'),
+                    ('Publication', 'Publication'), ('Year', 'Year'), ('num_citations', 'Number of citations')]
 
 layout = html.Div([
     dbc.Card([
@@ -38,96 +46,171 @@ layout = html.Div([
                             min=1,
                             value=10,
                             step=1,
+                            debounce=True,
                             className='mb-2'
                         ),
                     ]),
                 ], width=4)
             ], className='mb-3'),
-            html.Div(id='coauthors', className='mt-3'),
+            dash_table.DataTable(
+                id='coauthors',
+                columns=[{'name': name, 'id': column_id} for column_id, name in COAUTHOR_COLUMNS],
+                page_current=0,
+                page_size=PAGE_SIZE,
+                page_action='custom',
+                sort_action='custom',
+                sort_mode='single',
+                sort_by=[],
+                filter_action='custom',
+                filter_query='',
+                style_cell={'textAlign': 'left', 'whiteSpace': 'normal', 'height': 'auto'},
+                style_header={'fontWeight': 'bold'},
+                style_table={'marginTop': '1rem'},
+            ),
+            html.Hr(),
+            dbc.Row([
+                dbc.Col([
+                    html.Label("Collaboration network depth (co-authorship hops):"),
+                    dcc.Slider(id='network-hops', min=1, max=MAX_HOPS, step=1, value=1,
+                               marks={hop: str(hop) for hop in range(1, MAX_HOPS + 1)}),
+                ], width=4),
+                dbc.Col(html.Div(id='network-status', className='mt-2'), width=8),
+            ]),
+            dcc.Graph(id='collaboration-network', figure=go.Figure()),
+            dcc.Store(id='network-job-id'),
+            dcc.Interval(id='network-job-interval', interval=500, disabled=True),
         ], className="card-body")
     ])
 ])
 
 
 # MYSQL collaboration_viewer.py
+def network_figure(network):
+    positions = {node['id']: (node['x'], node['y']) for node in network['nodes']}
+    edge_x, edge_y = [], []
+    for edge in network['edges']:
+        (x0, y0), (x1, y1) = positions[edge['source']], positions[edge['target']]
+        edge_x += [x0, x1, None]
+        edge_y += [y0, y1, None]
+
+    # WebGL traces keep pan/zoom responsive with hundreds of nodes and edges
+    fig = go.Figure([
+        go.Scattergl(x=edge_x, y=edge_y, mode='lines', line=dict(width=0.6, color='#b0b0b0'), hoverinfo='skip'),
+        go.Scattergl(x=[node['x'] for node in network['nodes']], y=[node['y'] for node in network['nodes']],
+                     mode='markers', hoverinfo='text',
+                     text=[f"{node['name']}<br>{node['institute'] or ''}<br>hop {node['hop']}"
+                           for node in network['nodes']],
+                     marker=dict(size=[16 if node['hop'] == 0 else 9 for node in network['nodes']],
+                                 color=[node['hop'] for node in network['nodes']], colorscale='Viridis',
+                                 cmin=0, cmax=MAX_HOPS, line=dict(width=0.5, color='white'))),
+    ])
+    fig.update_layout(showlegend=False, margin=dict(l=10, r=10, t=10, b=10), height=600,
+                      xaxis=dict(visible=False), yaxis=dict(visible=False, scaleanchor='x'),
+                      uirevision='collaboration-network')
+    return fig
+
+
 def register_callbacks(app):
     @app.callback(
         Output('university-id', 'options'),
-        Input('university-id', 'search_value')
+        Input('university-id', 'search_value'),
+        State('university-id', 'value')
     )
-    def update_university_dropdown(selected_university):
-        with mysql_engine.connect() as connection:
-            result = connection.execute(text('SELECT id as uid, name FROM university'))
-            universities = pd.DataFrame(result.fetchall(), columns=["uid", "name"])
-        return [{'label': row['name'], 'value': row['uid']} for _, row in universities.iterrows()]
+    def update_university_dropdown(search_value, selected_university):
+        return search_index.search_university_options(search_value, selected=selected_university)
 
     @app.callback(
         Output('faculty-id', 'options'),
-        Input('university-id', 'value')
+        Input('university-id', 'value'),
+        Input('faculty-id', 'search_value'),
+        State('faculty-id', 'value')
     )
-    def update_faculty_dropdown(selected_university):
+    def update_faculty_dropdown(selected_university, search_value, selected_faculty):
         if selected_university is None:
             return []
-        with mysql_engine.connect() as connection:
-            result = connection.execute(text('SELECT id, name FROM faculty WHERE university_id = :uid'),
-                                        {"uid": selected_university})
-            faculty_list = pd.DataFrame(result.fetchall(), columns=["id", "name"])
-        return [{'label': row['name'], 'value': row['id']} for _, row in faculty_list.iterrows()]
+        return search_index.search_faculty_options(selected_university, search_value, selected=selected_faculty)
 
     @app.callback(
-        Output('coauthors', 'children'),
+        Output('coauthors', 'data'),
+        Output('coauthors', 'page_count'),
+        Output('coauthors', 'page_current'),
         Input('university-id', 'value'),
         Input('faculty-id', 'value'),
         Input('data-radio', 'value'),
-        Input('num-records-input', 'value')
+        Input('num-records-input', 'value'),
+        Input('coauthors', 'page_current'),
+        Input('coauthors', 'sort_by'),
+        Input('coauthors', 'filter_query')
     )
-    def show_coauthors(selected_university, selected_faculty, selected_radio, num_records):
+    def show_coauthors(selected_university, selected_faculty, selected_radio, num_records, page_current, sort_by,
+                       filter_query):
         if selected_faculty is None or selected_university is None or num_records is None:
-            return []
-        with mysql_engine.connect() as connection:
-            base_query = '''
-            SELECT DISTINCT f1.name AS faculty1, f2.name AS faculty2, u2.name AS university,
-            p.title AS publication, p.year, p.num_citations
-            FROM faculty f1
-            JOIN faculty_publication fp ON fp.faculty_id = f1.id
-            JOIN faculty_publication fp1 ON fp.publication_id = fp1.publication_id AND fp.faculty_id <> fp1.faculty_id
-            JOIN publication p ON p.id = fp.publication_id AND p.id = fp1.publication_id
-            JOIN faculty f2 ON f2.id = fp1.faculty_id
-            JOIN university u1 ON u1.id = f1.university_id
-            JOIN university u2 ON u2.id = f2.university_id
-            AND f1.id = :faculty_id
-            AND u1.id = :university_id
-            '''
-
-            if selected_radio == 0:
-                query = base_query + 'AND u1.id = u2.id'
-            else:
-                query = base_query + 'AND u1.id <> u2.id'
-
-            query = query + '''
-            ORDER BY p.num_citations ASC
-            LIMIT :limit
-            '''
-
-            result = connection.execute(text(query),
-                                        {"faculty_id": selected_faculty, "university_id": selected_university,
-                                         "limit": num_records})
-
-            recent_publications = pd.DataFrame(result.fetchall(),
-                                               columns=["Faculty1", "Faculty2", "University", "Publication", "Year",
-                                                        "num_citations"])
-
-            recent_publications.rename(columns={
-                'Faculty1': 'Faculty',
-                'Faculty2': 'Co-Author',
-                'num_citations': 'Number of citations',
-                'created_at': 'Created at'
-            }, inplace=True)
-
-            recent_publications.reset_index(drop=True, inplace=True)
-            recent_publications.index += 1
-            recent_publications.reset_index(inplace=True)
-            recent_publications.rename(columns={"index": "#"}, inplace=True)
-        
-        return dbc.Table.from_dataframe(recent_publications, striped=True, bordered=True, hover=True)
+            return [], 1, 0
+        # Any change other than paging starts again from the first page
+        if 'coauthors.page_current' not in callback_context.triggered_prop_ids:
+            page_current = 0
+
+        # The full co-author set is fetched once per faculty member and cached; the radio, the
+        # record count, sorting, filtering and paging only slice it
+        coauthors = select_coauthors(get_coauthor_set(selected_faculty, selected_university),
+                                     selected_radio == 0, num_records)
+        coauthors.insert(0, '#', range(1, len(coauthors) + 1))
+        coauthors = sort_and_filter_frame(coauthors, sort_by, filter_query)
+
+        page_count = max(1, -(-len(coauthors) // PAGE_SIZE))
+        page_current = min(page_current or 0, page_count - 1)
+        start = page_current * PAGE_SIZE
+        return coauthors.iloc[start:start + PAGE_SIZE].to_dict('records'), page_count, page_current
+
+    @app.callback(
+        Output('network-job-id', 'data'),
+        Output('network-job-interval', 'disabled'),
+        Output('network-status', 'children'),
+        Input('university-id', 'value'),
+        Input('faculty-id', 'value'),
+        Input('network-hops', 'value'),
+        State('network-job-id', 'data')
+    )
+    def start_network(selected_university, selected_faculty, hops, previous_job_id):
+        # Only the latest selection's traversal is worth finishing
+        if previous_job_id:
+            job_service.cancel(previous_job_id)
+        if selected_faculty is None or selected_university is None:
+            return None, True, None
+        university = dict(reference_cache.get_universities()).get(selected_university)
+        faculty = next((name for fid, name, _ in reference_cache.get_faculty() if fid == selected_faculty), None)
+        if university is None or faculty is None:
+            return None, True, None
+        job_id = job_service.submit('collaboration-network', expand_network, faculty, university, hops,
+                                    queue='network')
+        return job_id, False, html.Span(f"Expanding the network of {faculty}...", style={'color': 'gray'})
+
+    # Redraw the network after every completed hop until the traversal finishes
+    @app.callback(
+        Output('collaboration-network', 'figure'),
+        Output('network-status', 'children', allow_duplicate=True),
+        Output('network-job-interval', 'disabled', allow_duplicate=True),
+        Input('network-job-interval', 'n_intervals'),
+        State('network-job-id', 'data'),
+        prevent_initial_call=True
+    )
+    def poll_network(n_intervals, job_id):
+        if not job_id:
+            return no_update, no_update, True
+        job = job_service.get_job(job_id)
+        if job is None:
+            return no_update, html.Span("The network job could not be found; it may have expired or been started "
+                                        "by another server process. Select the faculty member again.",
+                                        style={'color': 'red'}), True
+        if job['status'] == 'failed':
+            return no_update, html.Span(f"Could not load the network: {job['error']}", style={'color': 'red'}), True
+
+        finished = job['status'] == 'done'
+        network = job['result']
+        if network is None:
+            return no_update, html.Span(job['message'], style={'color': 'gray'}), False
+        status = f"{len(network['nodes'])} faculty, {len(network['edges'])} collaborations"
+        if network['truncated']:
+            status += " (limited to the strongest collaborations)"
+        return network_figure(network), status if finished else f"{status}, still expanding...", finished
 # MYSQL collaboration_viewer.py
@@ -0,0 +1,151 @@
+import dash_bootstrap_components as dbc
+import pandas as pd
+
+from dash import dcc, html, Input, Output, State
+from services import reference_cache, search_index
+from services.expertise_index import DEFAULT_TOP_K, similar_to_faculty, similar_to_keywords
+
+# Most results a search may return
+MAX_TOP_K = 100
+
+layout = html.Div(
+    [
+        dbc.Row(
+            dbc.Col(
+                dbc.Card(
+                    [
+                        dbc.CardHeader("Find Faculty with Similar Expertise"),
+                        dbc.CardBody(
+                            [
+                                dbc.RadioItems(
+                                    id='expertise-mode',
+                                    options=[
+                                        {'label': ' Similar to a faculty member', 'value': 'faculty'},
+                                        {'label': ' Matching keywords', 'value': 'keywords'}
+                                    ],
+                                    value='faculty',
+                                    inline=True,
+                                    className='mb-3 custom-radio'
+                                ),
+                                html.Div(id='expertise-faculty-container', children=[
+                                    dbc.Row([
+                                        dbc.Col([
+                                            dcc.Dropdown(placeholder='Select University:',
+                                                         id='expertise-university-id', className='mb-3')
+                                        ], width=6),
+                                        dbc.Col([
+                                            dcc.Dropdown(placeholder='Select Faculty',
+                                                         id='expertise-faculty-id', className='mb-3')
+                                        ], width=6)
+                                    ]),
+                                ]),
+                                html.Div(id='expertise-keywords-container', style={'display': 'none'}, children=[
+                                    dbc.Input(id='expertise-keywords-input', type='text', debounce=True,
+                                              placeholder='Keywords, comma separated (e.g. machine learning, '
+                                                          'computer vision)',
+                                              className='mb-3'),
+                                ]),
+                                dbc.Row([
+                                    dbc.Col([
+                                        dbc.InputGroup([
+                                            dbc.InputGroupText("Number of results:"),
+                                            dbc.Input(id='expertise-top-k', type='number', min=1, max=MAX_TOP_K,
+                                                      value=DEFAULT_TOP_K, step=1, debounce=True),
+                                        ]),
+                                    ], width=4)
+                                ], className='mb-3'),
+                                html.Div(id='expertise-results', className='mt-3'),
+                            ]
+                        ),
+                    ],
+                    style={"marginTop": "1rem"},
+                )
+            )
+        ),
+    ]
+)
+
+
+def _results_table(results):
+    faculty = {fid: (name, university_id) for fid, name, university_id in reference_cache.get_faculty()}
+    universities = dict(reference_cache.get_universities())
+    rows = []
+    for faculty_id, similarity, shared in results:
+        name, university_id = faculty.get(faculty_id, (str(faculty_id), None))
+        rows.append((name, universities.get(university_id, ''), round(similarity, 3), ', '.join(shared)))
+    table = pd.DataFrame(rows, columns=['Faculty', 'University', 'Similarity', 'Top shared keywords'])
+    table.index += 1
+    table.reset_index(inplace=True)
+    table.rename(columns={"index": "#"}, inplace=True)
+    return dbc.Table.from_dataframe(table, striped=True, bordered=True, hover=True)
+
+
+# MYSQL expertise_search.py
+def register_callbacks(app):
+    @app.callback(
+        Output('expertise-faculty-container', 'style'),
+        Output('expertise-keywords-container', 'style'),
+        Input('expertise-mode', 'value')
+    )
+    def toggle_expertise_inputs(mode):
+        if mode == 'keywords':
+            return {'display': 'none'}, {}
+        return {}, {'display': 'none'}
+
+    @app.callback(
+        Output('expertise-university-id', 'options'),
+        Input('expertise-university-id', 'search_value'),
+        State('expertise-university-id', 'value')
+    )
+    def update_university_dropdown(search_value, selected_university):
+        return search_index.search_university_options(search_value, selected=selected_university)
+
+    @app.callback(
+        Output('expertise-faculty-id', 'options'),
+        Input('expertise-university-id', 'value'),
+        Input('expertise-faculty-id', 'search_value'),
+        State('expertise-faculty-id', 'value')
+    )
+    def update_faculty_dropdown(selected_university, search_value, selected_faculty):
+        if selected_university is None:
+            return []
+        return search_index.search_faculty_options(selected_university, search_value, selected=selected_faculty)
+
+    @app.callback(
+        Output('expertise-results', 'children'),
+        Input('expertise-mode', 'value'),
+        Input('expertise-faculty-id', 'value'),
+        Input('expertise-keywords-input', 'value'),
+        Input('expertise-top-k', 'value')
+    )
+    def show_similar_faculty(mode, selected_faculty, keywords, top_k):
+        # The input's min/max/step are only enforced in the browser
+        try:
+            top_k = int(max(1, min(MAX_TOP_K, float(top_k or DEFAULT_TOP_K))))
+        except (TypeError, ValueError):
+            top_k = DEFAULT_TOP_K
+        unknown = []
+        if mode == 'keywords':
+            terms = [term for term in (keywords or '').split(',') if term.strip()]
+            if not terms:
+                return []
+            found = similar_to_keywords(terms, k=top_k)
+            results, unknown = found if found is not None else (None, [])
+        else:
+            if selected_faculty is None:
+                return []
+            results = similar_to_faculty(selected_faculty, k=top_k)
+
+        if results is None:
+            return html.Span("The expertise index has not been built yet. "
+                             "Run `python manage.py build-expertise-index`.", style={'color': 'red'})
+        children = []
+        if unknown:
+            children.append(html.P(f"Unknown keywords ignored: {', '.join(term.strip() for term in unknown)}",
+                                   style={'color': 'gray'}))
+        if not results:
+            children.append(html.P("No faculty with matching keywords found."))
+        else:
+            children.append(_results_table(results))
+        return children
+# MYSQL expertise_search.py
@@ -1,8 +1,19 @@
 import dash_bootstrap_components as dbc
 
-from dash import dcc, html, Input, Output
+from dash import dash_table, dcc, html, Input, Output, State
+from dash.exceptions import PreventUpdate
+from services import warmup
+from services.keyword_analytics import ROLLING_WINDOW, TREND_YEARS, get_emerging_keywords
 from services.mongodb_service import get_keyword_options, get_keyword_trends_data
 
+warmup.register('keyword_options', get_keyword_options)
+
+# (column id, header) of the Emerging Keywords table
+EMERGING_COLUMNS = [('keyword', 'Keyword'), ('recent_count', f'Publications (last {TREND_YEARS} years)'),
+                    ('latest_count', 'Latest year'), ('yoy_growth', 'YoY growth (%)'),
+                    ('rolling_avg', f'{ROLLING_WINDOW}-year average'), ('slope', 'Trend (publications/year)'),
+                    ('slope_t', 'Trend t-statistic')]
+
 layout = html.Div(
     [
         dbc.Row(
@@ -14,7 +25,7 @@ layout = html.Div(
                             [
                                 dcc.Dropdown(
                                     id='keyword-trends-dropdown',
-                                    options=get_keyword_options(),
+                                    options=[],
                                     multi=True,
                                     placeholder="Select Keywords",
                                     className="mb-3",
@@ -27,12 +38,47 @@ layout = html.Div(
                 )
             )
         ),
+        dbc.Row(
+            dbc.Col(
+                dbc.Card(
+                    [
+                        dbc.CardHeader("Emerging Keywords"),
+                        dbc.CardBody(
+                            [
+                                html.P("Keywords whose publication counts grew fastest over the last "
+                                       f"{TREND_YEARS} years. Click a keyword to add it to the chart above.",
+                                       className="mb-3"),
+                                dash_table.DataTable(
+                                    id='emerging-keywords-table',
+                                    columns=[{'name': name, 'id': column_id} for column_id, name in EMERGING_COLUMNS],
+                                    page_size=10,
+                                    sort_action='native',
+                                    style_cell={'textAlign': 'left'},
+                                    style_header={'fontWeight': 'bold'},
+                                ),
+                            ]
+                        ),
+                    ],
+                    style={"marginTop": "1rem"},
+                )
+            )
+        ),
     ]
 )
 
 
 # MONGODB keyword_trends.py
 def register_callbacks(app):
+    @app.callback(
+        Output('keyword-trends-dropdown', 'options'),
+        Input('keyword-trends-dropdown', 'search_value')
+    )
+    def update_keyword_options(search_value):
+        # The full list is sent once on page load; typing filters it client-side
+        if search_value:
+            raise PreventUpdate
+        return warmup.get('keyword_options')
+
     @app.callback(
         Output('keyword-trends-chart', 'figure'),
         Input('keyword-trends-dropdown', 'value'))
@@ -84,4 +130,33 @@ def register_callbacks(app):
         }
 
         return figure
+
+    # Ranked from the precomputed keyword_trend_metrics collection; no counts are aggregated here
+    @app.callback(
+        Output('emerging-keywords-table', 'data'),
+        Input('emerging-keywords-table', 'id')
+    )
+    def update_emerging_keywords(table_id):
+        emerging = get_emerging_keywords()
+        if emerging.empty:
+            return []
+        emerging = emerging.reindex(columns=[column_id for column_id, _ in EMERGING_COLUMNS])
+        emerging['yoy_growth'] = emerging['yoy_growth'] * 100
+        return emerging.round(2).to_dict('records')
+
+    @app.callback(
+        Output('keyword-trends-dropdown', 'value'),
+        Input('emerging-keywords-table', 'active_cell'),
+        State('emerging-keywords-table', 'derived_viewport_data'),
+        State('keyword-trends-dropdown', 'value'),
+        prevent_initial_call=True
+    )
+    def add_emerging_keyword(active_cell, rows, selected_keywords):
+        if not active_cell or not rows:
+            raise PreventUpdate
+        keyword = rows[active_cell['row']]['keyword']
+        selected_keywords = selected_keywords or []
+        if keyword in selected_keywords:
+            raise PreventUpdate
+        return selected_keywords + [keyword]
 # MONGODB keyword_trends.py
@@ -1,22 +1,13 @@
 import dash_bootstrap_components as dbc
-import pandas as pd
-import requests
 
-from dash import dcc, html, Input, Output, State, no_update
+from dash import callback_context, dash_table, dcc, html, Input, Output, State, no_update
+from services import image_proxy, photo_service, reference_cache, result_cache, search_index
+from services.coauthor_service import refresh_publication_edges
+from services.table_query import fetch_page
 from services.mysql_service import mysql_engine
 from sqlalchemy import text, exc
 
 
-def is_image_url_valid(image_url):
-    if image_url is None:
-        return False
-    try:
-        response = requests.head(image_url, timeout=5)
-        return response.status_code == 200 and 'image' in response.headers['Content-Type']
-    except (requests.exceptions.RequestException, KeyError):
-        return False
-
-
 # layout of the view
 # 1. University Dropdown
 # 2. Faculty Dropdown
@@ -25,6 +16,15 @@ def is_image_url_valid(image_url):
 # 5. Recent Publications
 
 
+RECENT_PUBLICATIONS_PAGE_SIZE = 10
+
+# (column id, header) of the Recently Added Publications table, and the SQL behind each column
+RECENT_PUBLICATION_COLUMNS = [('faculty', 'Faculty'), ('id', 'Publication ID'), ('title', 'Title'),
+                              ('venue', 'Venue'), ('year', 'Year'), ('num_citations', 'Number of citations'),
+                              ('created_at', 'Created at')]
+RECENT_PUBLICATION_SQL = {'faculty': 'f.name', 'id': 'p.id', 'title': 'p.title', 'venue': 'p.venue',
+                          'year': 'p.year', 'num_citations': 'p.num_citations', 'created_at': 'p.created_at'}
+
 layout = html.Div([
     dbc.Card([
         dbc.CardHeader("Enter New Publications", className="card-header"),
@@ -107,7 +107,21 @@ layout = html.Div([
             dbc.Card([
                 dbc.CardHeader("Recently Added Publications", className="card-header"),
                 dbc.CardBody([
-                    html.Div(id='recent-publications'),
+                    dash_table.DataTable(
+                        id='recent-publications',
+                        columns=[{'name': name, 'id': column_id} for column_id, name in RECENT_PUBLICATION_COLUMNS],
+                        page_current=0,
+                        page_size=RECENT_PUBLICATIONS_PAGE_SIZE,
+                        page_action='custom',
+                        sort_action='custom',
+                        sort_mode='single',
+                        sort_by=[],
+                        filter_action='custom',
+                        filter_query='',
+                        style_cell={'textAlign': 'left', 'whiteSpace': 'normal', 'height': 'auto'},
+                        style_header={'fontWeight': 'bold'},
+                    ),
+                    dcc.Store(id='recent-publications-cursors'),
                     dbc.Button('Refresh Table', id='pub-refresh-button', color="primary", className="mt-3")
                 ], className="card-body")
             ])
@@ -121,27 +135,23 @@ def register_callbacks(app):
     # update the university dropdown
     @app.callback(
         Output('pub-university-id', 'options'),
-        Input('pub-university-id', 'search_value')
+        Input('pub-university-id', 'search_value'),
+        State('pub-university-id', 'value')
     )
-    def update_university_dropdown(selected_university):
-        with mysql_engine.connect() as connection:
-            result = connection.execute(text('SELECT id AS uid, name FROM university'))
-            universities = pd.DataFrame(result.fetchall(), columns=["uid", "name"])
-        return [{'label': row['name'], 'value': row['uid']} for _, row in universities.iterrows()]
+    def update_university_dropdown(search_value, selected_university):
+        return search_index.search_university_options(search_value, selected=selected_university)
 
     # update faculty dropdown list from selected university
     @app.callback(
         Output('pub-faculty-id', 'options'),
-        Input('pub-university-id', 'value')
+        Input('pub-university-id', 'value'),
+        Input('pub-faculty-id', 'search_value'),
+        State('pub-faculty-id', 'value')
     )
-    def update_faculty_dropdown(selected_university):
+    def update_faculty_dropdown(selected_university, search_value, selected_faculty):
         if selected_university is None:
             return []
-        with mysql_engine.connect() as connection:
-            result = connection.execute(text('SELECT id, name FROM faculty WHERE university_id = :uid'),
-                                        {"uid": selected_university})
-            faculty_list = pd.DataFrame(result.fetchall(), columns=["id", "name"])
-        return [{'label': row['name'], 'value': row['id']} for _, row in faculty_list.iterrows()]
+        return search_index.search_faculty_options(selected_university, search_value, selected=selected_faculty)
 
     # update faculty publication counts
     def update_faculty_publication_cnt(selected_faculty):
@@ -165,9 +175,7 @@ def register_callbacks(app):
         with mysql_engine.connect() as connection:
             result = connection.execute(text('SELECT photo_url FROM faculty WHERE id = :fid'),
                                         {"fid": selected_faculty}).fetchone()
-            photo_url = result[0]
-            if not is_image_url_valid(photo_url):
-                photo_url = 'https://user-images.githubusercontent.com/8846884/232245136-e2a3e0f0-fd8c-4aa8-a18b-6e83848d9de3.jpeg'
+            photo_url = image_proxy.proxied_url(photo_service.get_photo_url(result[0]))
             return photo_url, update_faculty_publication_cnt(selected_faculty)
 
     # Insert a new publication into publication table using the details entered in the form
@@ -216,7 +224,10 @@ def register_callbacks(app):
                 try:
                     connection.execute(pub_query, pub_data)
                     connection.execute(fac_pub_query, fac_pub_data)
+                    refresh_publication_edges(connection, int(pub_id))
                     trans.commit()
+                    reference_cache.invalidate()
+                    result_cache.bump_data_version('publications')
                     result = update_faculty_publication_cnt(fac_id)
                 except exc.SQLAlchemyError:
                     trans.rollback()
@@ -232,37 +243,39 @@ def register_callbacks(app):
         except exc.SQLAlchemyError as e:
             error = str(e)
             print("the error is:" + error)
-            return error, no_update
+            return error, no_update, no_update
 
-    # display top 10 publications that are recently added which includes the latest one
-    # that is just added by entering in the form
+    # display the recently added publications, newest first, one page at a time; sorting, filtering
+    # and paging are done in SQL so only the visible page is sent to the browser
     @app.callback(
-        Output('recent-publications', 'children'),
-        [Input('pub-refresh-button', 'n_clicks'),
-         Input('refresh-counter', 'data')]
+        Output('recent-publications', 'data'),
+        Output('recent-publications', 'page_count'),
+        Output('recent-publications-cursors', 'data'),
+        Output('recent-publications', 'page_current'),
+        Input('pub-refresh-button', 'n_clicks'),
+        Input('refresh-counter', 'data'),
+        Input('recent-publications', 'page_current'),
+        Input('recent-publications', 'sort_by'),
+        Input('recent-publications', 'filter_query'),
+        State('recent-publications-cursors', 'data')
     )
-    def update_recent_publications(n_clicks, refresh_counter):
+    def update_recent_publications(n_clicks, refresh_counter, page_current, sort_by, filter_query, cursors):
+        # New rows invalidate the page cursors and the row count
+        if callback_context.triggered_id in ('pub-refresh-button', 'refresh-counter'):
+            cursors = None
+        # Any change other than paging (refresh, sort, filter) starts again from the first page
+        if 'recent-publications.page_current' not in callback_context.triggered_prop_ids:
+            page_current = 0
         with mysql_engine.connect() as connection:
-            result = connection.execute(text(
-                'SELECT f.name AS faculty, p.id, title, venue, year, num_citations, created_at '
+            records, page_count, cursors = fetch_page(
+                connection,
                 'FROM publication p '
                 'INNER JOIN faculty_publication fp ON fp.publication_id = p.id '
-                'INNER JOIN faculty f ON fp.faculty_id = f.id '
-                'WHERE created_at IS NOT NULL ORDER BY created_at DESC LIMIT 10'))
-            recent_publications = pd.DataFrame(result.fetchall(),
-                                               columns=["faculty", "id", "title", "venue", "year", "num_citations",
-                                                        "created_at"])
-
-            # Rename the columns
-            recent_publications.rename(columns={
-                'faculty': 'Faculty',
-                'id': 'Publication ID',
-                'title': 'Title',
-                'venue': 'Venue',
-                'year': 'Year',
-                'num_citations': 'Number of citations',
-                'created_at': 'Created at'
-            }, inplace=True)
-
-        return dbc.Table.from_dataframe(recent_publications, striped=True, bordered=True, hover=True)
+                'INNER JOIN faculty f ON fp.faculty_id = f.id',
+                RECENT_PUBLICATION_SQL, key_columns=['p.id', 'fp.faculty_id'],
+                base_conditions=['p.created_at IS NOT NULL'],
+                default_sort={'column_id': 'created_at', 'direction': 'desc'},
+                sort_by=sort_by, filter_query=filter_query, page_current=page_current or 0,
+                page_size=RECENT_PUBLICATIONS_PAGE_SIZE, state=cursors)
+        return records, page_count, cursors, page_current or 0
 # MYSQL new_publications.py
@@ -2,9 +2,14 @@ import pandas as pd
 import plotly.express as px
 import dash_bootstrap_components as dbc
 
-from dash import dcc, html, Input, Output
-from services.mysql_service import mysql_engine, get_top_keywords_by_university
-from sqlalchemy import text
+from dash import dcc, html, Input, Output, State
+from services import image_proxy, reference_cache, search_index, warmup
+from services.keyword_score_service import get_keyword_leaders
+from services.mysql_service import get_university_keywords
+from services.university_similarity import get_matrix
+
+# Load the university x keyword matrix in the background at startup rather than on the first comparison
+warmup.register('university_keyword_matrix', get_matrix)
 
 layout = html.Div(
     [
@@ -15,45 +20,90 @@ layout = html.Div(
                         dbc.CardHeader("Top Keywords in Different Universities"),
                         dbc.CardBody(
                             [
-                                dcc.Dropdown(
-                                    id='university-keywords-dropdown',
-                                    options=[],
-                                    placeholder="Select a University",
-                                    style={'fontSize': '16px'},
+                                dbc.RadioItems(
+                                    id='top-keywords-mode',
+                                    options=[
+                                        {'label': ' Single university', 'value': 'single'},
+                                        {'label': ' Compare universities', 'value': 'compare'}
+                                    ],
+                                    value='single',
+                                    inline=True,
+                                    className='mb-3 custom-radio'
                                 ),
-                                # html.H4(id='unique-keywords', style={'text-align': 'center'}),
-                                html.Br(),
-                                html.Div([
-                                    dbc.Col(
-                                        dbc.Card(
+                                html.Div(id='single-university-container', children=[
+                                    dcc.Dropdown(
+                                        id='university-keywords-dropdown',
+                                        options=[],
+                                        placeholder="Select a University",
+                                        style={'fontSize': '16px'},
+                                    ),
+                                    # html.H4(id='unique-keywords', style={'text-align': 'center'}),
+                                    html.Br(),
+                                    html.Div([
+                                        dbc.Col(
+                                            dbc.Card(
+                                                [
+                                                    dbc.CardBody(
+                                                        [
+                                                            html.Img(id='university-logo',
+                                                                     style={'height': '250px', 'width': '100%',
+                                                                            'object-fit': 'contain'}),
+                                                            html.H4(id='university-name', className='card-title',
+                                                                    style={'text-align': 'center'})
+                                                        ]
+                                                    ),
+                                                ],
+                                                style={'marginRight': '1rem'},
+                                            ),
+                                            width=4,
+                                        ),
+                                        dbc.Col(
+                                            dbc.Card(
+                                                [
+                                                    dbc.CardBody(
+                                                        [
+                                                            dcc.Graph(id='top-keywords-chart')
+                                                        ]
+                                                    ),
+                                                ],
+                                            ),
+                                            width=8,
+                                        ),
+                                    ], style={'display': 'flex', 'align-items': 'center', 'justify-content': 'center'}),
+                                    html.Br(),
+                                    dbc.Card(
+                                        dbc.CardBody(
+                                            [
+                                                dcc.Graph(id='keyword-leaders-chart')
+                                            ]
+                                        ),
+                                    ),
+                                ]),
+                                html.Div(id='compare-universities-container', style={'display': 'none'}, children=[
+                                    dcc.Dropdown(
+                                        id='compare-universities-dropdown',
+                                        options=[],
+                                        multi=True,
+                                        placeholder="Select universities to compare",
+                                        style={'fontSize': '16px'},
+                                    ),
+                                    html.Br(),
+                                    dbc.Card(
+                                        dbc.CardBody(
                                             [
-                                                dbc.CardBody(
-                                                    [
-                                                        html.Img(id='university-logo',
-                                                                 style={'height': '250px', 'width': '100%',
-                                                                        'object-fit': 'contain'}),
-                                                        html.H4(id='university-name', className='card-title',
-                                                                style={'text-align': 'center'})
-                                                    ]
-                                                ),
-                                            ],
-                                            style={'marginRight': '1rem'},
+                                                dcc.Graph(id='university-similarity-heatmap')
+                                            ]
                                         ),
-                                        width=4,
                                     ),
-                                    dbc.Col(
-                                        dbc.Card(
+                                    html.Br(),
+                                    dbc.Card(
+                                        dbc.CardBody(
                                             [
-                                                dbc.CardBody(
-                                                    [
-                                                        dcc.Graph(id='top-keywords-chart')
-                                                    ]
-                                                ),
-                                            ],
+                                                dcc.Graph(id='similar-universities-chart')
+                                            ]
                                         ),
-                                        width=8,
                                     ),
-                                ], style={'display': 'flex', 'align-items': 'center', 'justify-content': 'center'}),
+                                ]),
                             ]
                         ),
                     ],
@@ -69,13 +119,11 @@ layout = html.Div(
 def register_callbacks(app):
     @app.callback(
         Output('university-keywords-dropdown', 'options'),
-        Input('university-keywords-dropdown', 'search_value')
+        Input('university-keywords-dropdown', 'search_value'),
+        State('university-keywords-dropdown', 'value')
     )
-    def update_university_keywords_dropdown_options(search_value):
-        with mysql_engine.connect() as connection:
-            universities = pd.read_sql_query(text("SELECT name FROM university ORDER BY name"), connection)
-
-        return [{'label': row['name'], 'value': row['name']} for _, row in universities.iterrows()]
+    def update_university_keywords_dropdown_options(search_value, selected_university):
+        return search_index.search_university_options(search_value, value_field='name', selected=selected_university)
 
     @app.callback(
         Output('university-logo', 'src'),
@@ -89,30 +137,13 @@ def register_callbacks(app):
             empty_chart.update_layout(title_x=0.5)
             return '', empty_chart, ''
 
-        query = f"SELECT photo_url FROM university WHERE name = '{university_name}'"
-        with mysql_engine.connect() as connection:
-            logo_url = connection.scalar(text(query))
-
-        logo_src = logo_url
+        summary = get_university_keywords(university_name)
+        logo_src = image_proxy.proxied_url(summary['logo_url'])
+        unique_keywords_count = summary['unique_keywords_count']
 
-        data = get_top_keywords_by_university(university_name)
-
-        fig = px.treemap(data, path=['keyword'], values='total_score',
+        fig = px.treemap(summary['keywords'], path=['keyword'], values='total_score',
                          color_discrete_sequence=px.colors.diverging.Geyser)
 
-        query = f"""
-            SELECT COUNT(DISTINCT k.id) as unique_keywords_count
-            FROM keyword k
-            JOIN faculty_keyword fk ON k.id = fk.keyword_id
-            JOIN faculty f ON fk.faculty_id = f.id
-            JOIN university u ON f.university_id = u.id
-            WHERE u.name = '{university_name}'
-            LIMIT 10
-        """
-
-        with mysql_engine.connect() as connection:
-            unique_keywords_count = connection.scalar(text(query))
-
         fig.update_layout(
             title=f'Top 10 Keywords for {university_name} — Number of Unique Keywords: {unique_keywords_count}',
             title_font=dict(size=20),
@@ -120,4 +151,77 @@ def register_callbacks(app):
         )
 
         return logo_src, fig, university_name
+
+    # Clicking a keyword in the treemap shows the universities that lead in it
+    @app.callback(
+        Output('keyword-leaders-chart', 'figure'),
+        Input('top-keywords-chart', 'clickData')
+    )
+    def update_keyword_leaders_chart(click_data):
+        if not click_data:
+            empty_chart = px.bar(title="Click a keyword above to see which universities lead in it.")
+            empty_chart.update_layout(title_x=0.5)
+            return empty_chart
+
+        keyword = click_data['points'][0]['label']
+        leaders = get_keyword_leaders(keyword)
+        fig = px.bar(leaders, x='total_score', y='university', orientation='h',
+                     hover_data=['faculty_count'], color_discrete_sequence=px.colors.diverging.Geyser,
+                     labels={'total_score': 'Total keyword score', 'university': '',
+                             'faculty_count': 'Faculty with keyword'})
+        fig.update_layout(title=f'Universities Leading in "{keyword}"', title_font=dict(size=20), title_x=0.5,
+                          yaxis={'categoryorder': 'total ascending'})
+        return fig
+
+    @app.callback(
+        Output('single-university-container', 'style'),
+        Output('compare-universities-container', 'style'),
+        Input('top-keywords-mode', 'value')
+    )
+    def toggle_top_keywords_mode(mode):
+        if mode == 'compare':
+            return {'display': 'none'}, {}
+        return {}, {'display': 'none'}
+
+    @app.callback(
+        Output('compare-universities-dropdown', 'options'),
+        Input('compare-universities-dropdown', 'search_value'),
+        State('compare-universities-dropdown', 'value')
+    )
+    def update_compare_universities_options(search_value, selected_universities):
+        return search_index.search_university_options(search_value, selected=selected_universities)
+
+    # Similarities come from the cached university x keyword matrix; nothing is queried per comparison
+    @app.callback(
+        Output('university-similarity-heatmap', 'figure'),
+        Output('similar-universities-chart', 'figure'),
+        Input('compare-universities-dropdown', 'value')
+    )
+    def update_university_comparison(selected_universities):
+        if not selected_universities:
+            empty_chart = px.imshow([[0]], title="Select universities to compare their research profiles.")
+            empty_chart.update_layout(title_x=0.5)
+            empty_bar = px.bar(title="Select a university to see the most similar ones.")
+            empty_bar.update_layout(title_x=0.5)
+            return empty_chart, empty_bar
+
+        names = dict(reference_cache.get_universities())
+        matrix = get_matrix()
+        ids, similarity = matrix.similarity_matrix(selected_universities)
+        labels = [names.get(university_id, str(university_id)) for university_id in ids]
+        heatmap = px.imshow(similarity, x=labels, y=labels, zmin=0, zmax=1, text_auto='.2f',
+                            color_continuous_scale='Teal', labels={'color': 'Cosine similarity'})
+        heatmap.update_layout(title='Keyword Profile Similarity', title_font=dict(size=20), title_x=0.5,
+                              height=max(400, 45 * len(ids) + 150))
+
+        reference = selected_universities[0]
+        similar = pd.DataFrame([(names.get(university_id, str(university_id)), score)
+                                for university_id, score in matrix.similar(reference)],
+                               columns=['university', 'similarity'])
+        bar = px.bar(similar, x='similarity', y='university', orientation='h',
+                     color_discrete_sequence=px.colors.diverging.Geyser,
+                     labels={'similarity': 'Cosine similarity', 'university': ''})
+        bar.update_layout(title=f'Universities Most Similar to {names.get(reference, reference)}',
+                          title_font=dict(size=20), title_x=0.5, yaxis={'categoryorder': 'total ascending'})
+        return heatmap, bar
 # MYSQL top_keywords.py
@@ -6,8 +6,8 @@ import plotly.express as px
 
 from dash import dcc, html, Input, Output, State, no_update
 from io import BytesIO
-from fuzzywuzzy import process
-from services.mysql_service import mysql_engine, update_university_rank
+from services import job_service, ranking_reader, ranking_service, reference_cache, search_index
+from services.mysql_service import mysql_engine
 from sqlalchemy import text, exc
 
 layout = html.Div([
@@ -17,7 +17,7 @@ layout = html.Div([
             dbc.Tabs([
                 dbc.Tab([
                     dbc.Row([
-                        dbc.Col(html.H5("Upload XLSX File"), width=4)
+                        dbc.Col(html.H5("Upload XLSX or CSV File"), width=4)
                     ]),
                     dbc.Row([
                         dbc.Col(
@@ -90,6 +90,8 @@ layout = html.Div([
     ]),
     html.Button('Refresh Chart', id='refresh-button', className='btn btn-primary'),
     dcc.Store(id='store-uploaded-data'),
+    dcc.Store(id='upload-job-id'),
+    dcc.Interval(id='upload-job-interval', interval=1000, disabled=True),
 ])
 
 
@@ -101,7 +103,7 @@ def register_callbacks(app):
     )
     def display_file_name_and_update_submit_button(filename):
         if filename is not None:
-            if filename.lower().endswith('.xlsx'):
+            if ranking_reader.is_supported_file(filename):
                 return [html.Span(f"Uploaded File: {filename} ", style={'color': 'green'}),
                         html.Span("✅", style={'color': 'green'})], False
             else:
@@ -113,13 +115,11 @@ def register_callbacks(app):
     # update university dropdown
     @app.callback(
         Output('university-dropdown', 'options'),
-        Input('university-dropdown', 'search_value')
+        Input('university-dropdown', 'search_value'),
+        State('university-dropdown', 'value')
     )
-    def update_university_dropdown(search_value):
-        with mysql_engine.connect() as connection:
-            result = connection.execute(text('SELECT id AS uid, name FROM university'))
-            universities = pd.DataFrame(result.fetchall(), columns=["uid", "name"])
-        return [{'label': row['name'], 'value': row['name']} for _, row in universities.iterrows()]
+    def update_university_dropdown(search_value, selected_university):
+        return search_index.search_university_options(search_value, value_field='name', selected=selected_university)
 
     @app.callback(
         [Output('query-status', 'children'),
@@ -155,6 +155,7 @@ def register_callbacks(app):
                     except exc.SQLAlchemyError:
                         trans.rollback()
                         raise
+                reference_cache.invalidate()
 
                 refresh_n_clicks = 0 if refresh_n_clicks is None else refresh_n_clicks
 
@@ -219,107 +220,23 @@ def register_callbacks(app):
 
         return fig
 
-    def read_excel_file(contents):
+    def decode_upload(contents):
         content_type, content_string = contents.split(',')
-        decoded = base64.b64decode(content_string)
-        df = pd.read_excel(BytesIO(decoded), skiprows=3, header=None)
-        return df
-
-    def filter_and_process_dataframe(df):
-        # check if the first col in the dataframe is "rank display" for 2023 file | "rank in country" for 2022 file
-        if df.iloc[0, 0] == 'rank display':
-            institution_col = 2  # C
-            cpf_rank_col = 17  # R
-            cpf_score_col = 16  # Q
-            country_col = 4  # E
-        elif df.iloc[0, 0] == 'rank in country':
-            institution_col = 4  # E
-            cpf_rank_col = 19  # T
-            cpf_score_col = 18  # S
-            country_col = 6  # G
-
-        filtered_df = df.iloc[:, [institution_col, cpf_rank_col, cpf_score_col, country_col]].copy()
-
-        filtered_df.columns = ['institution', 'cpf rank', 'cpf score', 'country']
-
-        filtered_df.loc[:, 'cpf rank'] = filtered_df['cpf rank'].replace('+', 1000)
-
-        filtered_df.loc[:, 'Citations per Faculty Rank'] = pd.to_numeric(filtered_df['cpf rank'], errors='coerce')
-
-        average_score_601 = filtered_df.loc[
-            filtered_df['Citations per Faculty Rank'] >= 601, 'cpf score'].mean()
-
-        filtered_df.loc[
-            filtered_df['Citations per Faculty Rank'] >= 601, 'Citations per Faculty Rank'] = average_score_601
-
-        filtered_df = filtered_df.dropna()
-
-        filtered_df = filtered_df.loc[filtered_df['country'] == 'United States']
-
-        filtered_df = filtered_df.sort_values(by='Citations per Faculty Rank')
-
-        filtered_df = filtered_df[['institution', 'Citations per Faculty Rank', 'cpf score']].rename(
-            columns={'institution': 'University Name', 'cpf score': 'Score'})
-
-        return filtered_df
-
-    def update_university_rankings(df, min_match_score=88):
-        with mysql_engine.connect() as connection:
-            # Start a transaction
-            trans = connection.begin()
+        return BytesIO(base64.b64decode(content_string))
 
-            # Get the existing university data
-            result = connection.execute(text('SELECT id, name FROM university'))
-            df_university = pd.DataFrame(result.fetchall(), columns=["id", "name"])
-
-            sql_universities = {name: idx for idx, name in df_university[['id', 'name']].itertuples(index=False)}
-            csv_universities = {row['University Name']: row['Citations per Faculty Rank'] for index, row in
-                                df.iterrows()}
-
-            # Update the university rankings
-            for csv_university_name, citations_rank in csv_universities.items():
-                best_match, match_score = process.extractOne(csv_university_name, sql_universities.keys())
-                if match_score >= min_match_score:
-                    university_id = sql_universities[best_match]
-                    update_university_rank(university_id, citations_rank, connection)
-
-            specific_universities = [
-                'University of Florida',
-                'Purdue University--West Lafayette',
-                'University of San Diego',
-            ]
-
-            for university_name in specific_universities:
-                best_match, match_score = process.extractOne(university_name, csv_universities.keys())
-                if match_score >= min_match_score:
-                    university_id = sql_universities[university_name]
-                    update_university_rank(university_id, csv_universities[best_match], connection)
-
-            # Manual updates for universities that aren't matched by fuzzywuzzy
-            manual_updates = {
-                'Virginia Tech': 362,
-                'Stony Brook University--SUNY': 395,
-                'Brigham Young University--Provo': 582,
-                'University of Denver': 595
-            }
-
-            for university_name, university_rank in manual_updates.items():
-                if university_name in sql_universities:
-                    university_id = sql_universities[university_name]
-                    update_university_rank(university_id, university_rank, connection)
-
-            # Commit the transaction
-            trans.commit()
-
-            # Count the updated rows and return the result
-            updated_universities_count_query = text("SELECT COUNT(*) FROM university WHERE university_rank IS NOT NULL")
-            updated_universities_count = connection.execute(updated_universities_count_query).scalar()
-
-        return updated_universities_count
+    # Runs in the background job pool: parse, match and apply the uploaded rankings
+    def import_rankings(contents, filename, report):
+        batches = ranking_reader.iter_ranking_batches(
+            decode_upload(contents), filename,
+            report_progress=lambda fraction: report(progress=fraction * 95))
+        stats = ranking_service.update_university_rankings(batches, report=lambda message: report(message=message))
+        reference_cache.invalidate()
+        return stats
 
     @app.callback(
         [Output('output', 'children'),
-         Output('store-uploaded-data', 'data')],
+         Output('upload-job-id', 'data'),
+         Output('upload-job-interval', 'disabled')],
         Input('submit-button-upload', 'n_clicks'),
         State('file-upload', 'contents'),
         State('file-upload', 'filename')
@@ -327,23 +244,55 @@ def register_callbacks(app):
     def handle_file_upload(n_clicks_upload=0, contents=None, filename=None):
         if n_clicks_upload:
             if contents is not None and filename is not None:
-                if filename.lower().endswith('.xlsx'):
-                    df = read_excel_file(contents)
-                    filtered_df = filter_and_process_dataframe(df)
-                    updated_universities_count = update_university_rankings(filtered_df)
-
-                    return [html.Div([html.Span(
-                        f'File uploaded and processed: {filename}. {updated_universities_count} university rankings updated.',
-                        style={'color': 'green'}), html.Span("✅", style={'color': 'green'})]),
-                        updated_universities_count]
+                if ranking_reader.is_supported_file(filename):
+                    job_id = job_service.submit(filename, import_rankings, contents, filename)
+                    return [html.Div([html.Span(f"Processing {filename}...", style={'color': 'gray'}),
+                                      dbc.Progress(value=0, striped=True, animated=True)]),
+                            job_id, False]
                 else:
                     return [html.Div([html.Span(
                         f"File: {filename} with type {filename.split('.')[-1].upper()} not supported ",
-                        style={'color': 'red'}), html.Span("❌", style={'color': 'red'})]), None]
+                        style={'color': 'red'}), html.Span("❌", style={'color': 'red'})]), None, True]
             else:
-                return [html.Div('No file uploaded.'), None]
+                return [html.Div('No file uploaded.'), None, True]
         else:
-            return [None, None]
+            return [None, None, True]
+
+    # Poll the background upload job and report its progress until it finishes
+    @app.callback(
+        [Output('output', 'children', allow_duplicate=True),
+         Output('store-uploaded-data', 'data'),
+         Output('upload-job-interval', 'disabled', allow_duplicate=True)],
+        Input('upload-job-interval', 'n_intervals'),
+        State('upload-job-id', 'data'),
+        prevent_initial_call=True
+    )
+    def poll_upload_job(n_intervals, job_id):
+        if not job_id:
+            return no_update, no_update, True
+        job = job_service.get_job(job_id)
+        if job is None:
+            return [html.Span("The upload job could not be found; it may have expired or been started by another "
+                              "server process. Check the rankings or upload the file again.",
+                              style={'color': 'red'}), no_update, True]
+
+        if job['status'] == 'failed':
+            return [html.Div([html.Span(f"Processing {job['name']} failed: {job['error']} ", style={'color': 'red'}),
+                              html.Span("❌", style={'color': 'red'})]), no_update, True]
+
+        if job['status'] == 'done':
+            stats = job['result']
+            return [html.Div([html.Span(
+                f"File uploaded and processed: {job['name']}. {stats['updated']} university rankings updated "
+                f"({stats['matched']} matched, {stats['ambiguous']} of them ambiguous, "
+                f"{stats['unmatched']} unmatched).",
+                style={'color': 'green'}), html.Span("✅", style={'color': 'green'})]),
+                stats['updated'], True]
+
+        return [html.Div([html.Span(f"Processing {job['name']}: {job['message']}", style={'color': 'gray'}),
+                          dbc.Progress(value=job['progress'], label=f"{job['progress']}%",
+                                       striped=True, animated=True)]),
+                no_update, False]
 
     @app.callback(
         Output('dummy-output', 'children'),
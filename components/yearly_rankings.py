@@ -1,24 +1,25 @@
 import dash_bootstrap_components as dbc
-import functools
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
-from dash import dcc, html, Input, Output
-from services.neo4j_service import neo4j_driver
+from dash import dcc, html, Input, Output, State
+from dash.exceptions import PreventUpdate
+from services import result_cache, warmup
+from services.neo4j_service import (neo4j_session, timed, get_top_institutes, get_top_institutes_by_years,
+                                    YEAR_OPTIONS_QUERY)
 
 
-# Preload the year options:
+# Year options are loaded by the warm-up phase, not at import time
 def get_year_options():
-    query = """MATCH (pub:PUBLICATION) RETURN DISTINCT pub.year AS year ORDER BY year DESC"""
-    with neo4j_driver.session() as session:
-        result = session.run(query)
+    with neo4j_session() as session:
+        result = session.run(timed(YEAR_OPTIONS_QUERY))
         years = pd.DataFrame([r.data() for r in result])
 
     return [{'label': row['year'], 'value': row['year']} for _, row in years.iterrows()]
 
 
-year_options = get_year_options()
+warmup.register('year_options', get_year_options)
 
 layout = html.Div(
     [
@@ -29,11 +30,36 @@ layout = html.Div(
                         dbc.CardHeader("Yearly Ranking: Top 10 Universities by Faculty and Publications"),
                         dbc.CardBody(
                             [
-                                dcc.Dropdown(
-                                    id='year-dropdown',
-                                    options=year_options,
-                                    placeholder="Select a Year",
-                                    style={'fontSize': '16px'},
+                                dbc.RadioItems(
+                                    id='yearly-mode',
+                                    options=[
+                                        {'label': ' Single Year', 'value': 'single'},
+                                        {'label': ' Year Range', 'value': 'range'}
+                                    ],
+                                    value='single',
+                                    inline=True,
+                                    className='mb-3 custom-radio'
+                                ),
+                                html.Div(
+                                    dcc.Dropdown(
+                                        id='year-dropdown',
+                                        options=[],
+                                        placeholder="Select a Year",
+                                        style={'fontSize': '16px'},
+                                    ),
+                                    id='year-dropdown-container',
+                                ),
+                                html.Div(
+                                    dcc.RangeSlider(
+                                        id='year-range-slider',
+                                        min=0,
+                                        max=0,
+                                        step=1,
+                                        marks=None,
+                                        tooltip={'placement': 'bottom', 'always_visible': True},
+                                    ),
+                                    id='year-range-container',
+                                    style={'display': 'none'},
                                 ),
                                 dcc.Graph(id='faculty-publications-chart'),
                             ]
@@ -48,25 +74,120 @@ layout = html.Div(
 
 
 def register_callbacks(app):
+    @app.callback(
+        Output('year-dropdown', 'options'),
+        Input('year-dropdown', 'search_value')
+    )
+    def update_year_options(search_value):
+        # The full list is sent once on page load; typing filters it client-side
+        if search_value:
+            raise PreventUpdate
+        return warmup.get('year_options')
+
+    # Configure the year range slider once the year options have loaded
+    @app.callback(
+        Output('year-range-slider', 'min'),
+        Output('year-range-slider', 'max'),
+        Output('year-range-slider', 'marks'),
+        Output('year-range-slider', 'value'),
+        Input('year-dropdown', 'options'),
+        State('year-range-slider', 'value')
+    )
+    def update_year_range_slider(year_options, selected_range):
+        years = sorted(option['value'] for option in year_options or [])
+        if not years:
+            raise PreventUpdate
+        marks = {year: str(year) for year in years if year % 5 == 0}
+        if selected_range is None:
+            selected_range = [max(years[0], years[-1] - 9), years[-1]]
+        return years[0], years[-1], marks, selected_range
+
+    @app.callback(
+        Output('year-dropdown-container', 'style'),
+        Output('year-range-container', 'style'),
+        Input('yearly-mode', 'value')
+    )
+    def toggle_year_inputs(mode):
+        if mode == 'range':
+            return {'display': 'none'}, {'marginBottom': '2rem'}
+        return {}, {'display': 'none'}
+
     @app.callback(
         Output('faculty-publications-chart', 'figure'),
-        [Input('year-dropdown', 'value')]
+        Input('yearly-mode', 'value'),
+        Input('year-dropdown', 'value'),
+        Input('year-range-slider', 'value')
     )
-    @functools.lru_cache()
+    def update_yearly_rankings_chart(mode, selected_year, selected_range):
+        if mode == 'range':
+            if not selected_range:
+                return go.Figure()
+            return update_year_range_chart(int(selected_range[0]), int(selected_range[1]))
+        return update_faculty_publications_chart(selected_year)
+
+    @result_cache.cached('yearly_rankings_range', depends_on=('publications', 'yearly_rankings'))
+    def update_year_range_chart(first_year, last_year):
+        # Only years that have publications; years in the range without any would never be summarised
+        # and would force the live traversal
+        known_years = {option['value'] for option in warmup.get('year_options')}
+        years = [year for year in range(first_year, last_year + 1) if year in known_years]
+        counts = pd.DataFrame(get_top_institutes_by_years(years, limit=10) if years else [],
+                              columns=['year', 'university', 'faculty_count', 'publication_count'])
+        if counts.empty:
+            return go.Figure()
+
+        # Long format: one bar per (year, university, category); universities ordered by total publications
+        university_order = counts.groupby('university')['publication_count'].sum().sort_values(
+            ascending=False).index.tolist()
+        long_counts = counts.melt(id_vars=['year', 'university'], value_vars=['faculty_count', 'publication_count'],
+                                  var_name='Category', value_name='Count').sort_values('year')
+        long_counts['Category'] = long_counts['Category'].map(
+            {'faculty_count': 'Faculty Count', 'publication_count': 'Publication Count'})
+
+        fig = px.bar(
+            long_counts,
+            x='Count',
+            y='university',
+            color='Category',
+            animation_frame='year',
+            orientation='h',
+            barmode='group',
+            text_auto=True,
+            range_x=[0, long_counts['Count'].max() * 1.1],
+            labels={'university': 'University'},
+            category_orders={'university': university_order, 'Category': ['Faculty Count', 'Publication Count']},
+            color_discrete_map={'Faculty Count': '#00A0B0', 'Publication Count': '#EDC951'},
+        )
+
+        fig.update_layout(
+            height=700,
+            title_font=dict(size=20),
+            yaxis=dict(title=None, tickfont={'size': 14}),
+            xaxis=dict(title='Count', tickfont={'size': 14}),
+            xaxis_title_font=dict(size=18),
+            legend=dict(font={'size': 14}, title=dict(text='Category', font=dict(size=14)), itemsizing='constant'),
+            title={
+                'text': f'Top 10 Universities Faculty and Publications, {first_year}–{last_year}',
+                'x': 0.5,
+                'xanchor': 'center'
+            },
+            hoverlabel=dict(
+                bgcolor="white",
+                font_size=16,
+                font_family="PT Root UI"
+            )
+        )
+
+        fig.update_yaxes(automargin=True)
+
+        return fig
+
+    @result_cache.cached('yearly_rankings', depends_on=('publications', 'yearly_rankings'))
     def update_faculty_publications_chart(selected_year):
         if selected_year is None:
             return go.Figure()
 
-        with neo4j_driver.session() as session:
-            query = """
-                MATCH (u:INSTITUTE)<-[:AFFILIATION_WITH]-(f:FACULTY)-[:PUBLISH]->(pub:PUBLICATION)
-                WHERE pub.year = $year
-                RETURN u.name AS university, COUNT(DISTINCT f) AS faculty_count, COUNT(DISTINCT pub) AS publication_count
-                ORDER BY publication_count DESC, faculty_count DESC
-                LIMIT 10
-            """
-            result = session.run(query, {"year": int(selected_year)})
-            faculty_count = pd.DataFrame([r.data() for r in result])
+        faculty_count = pd.DataFrame(get_top_institutes(selected_year, limit=10))
 
         fig = px.bar(
             faculty_count,
@@ -0,0 +1,6 @@
+import os
+
+# Key that signs proxied image URLs. Every worker process must use the same value so they accept each
+# other's URLs, and it must stay the same across restarts so pages already served keep their images.
+# Set it here or in the IMAGE_PROXY_SECRET environment variable; the app refuses to start without one.
+IMAGE_PROXY_SECRET = os.environ.get('IMAGE_PROXY_SECRET', '')
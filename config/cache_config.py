@@ -0,0 +1,7 @@
+# Result cache for expensive chart callbacks: 'memory' (per process) or 'sqlite' (shared by all workers).
+# Data versions are always kept in the sqlite file at RESULT_CACHE_PATH, so invalidations made by other
+# processes on the same host (e.g. `python manage.py` commands) reach both backends.
+RESULT_CACHE_BACKEND = 'memory'
+RESULT_CACHE_PATH = 'cache/result_cache.sqlite3'
+RESULT_CACHE_MAX_ENTRIES = 512
+RESULT_CACHE_TTL_SECONDS = 3600
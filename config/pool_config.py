@@ -0,0 +1,32 @@
+# Connection pool and timeout defaults for each backend. Any value can be overridden in the JSON file
+# named by DB_SETTINGS_FILE (default: config/connection_settings.json) or with an environment variable
+# named <BACKEND>_<SETTING>, e.g. MYSQL_POOL_SIZE=20 or NEO4J_FETCH_SIZE=500.
+MYSQL_POOL = {
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_timeout': 30,
+    'pool_recycle': 1800,
+    'pool_pre_ping': True,
+    'query_timeout_ms': 30000,
+}
+
+MONGODB_POOL = {
+    'max_pool_size': 50,
+    'min_pool_size': 0,
+    'max_idle_time_ms': 300000,
+    'wait_queue_timeout_ms': 30000,
+    'server_selection_timeout_ms': 5000,
+    'connect_timeout_ms': 5000,
+    # Applied to the dashboard's reads only; manage.py rollup refreshes are not time-limited
+    'query_timeout_ms': 30000,
+    'fetch_size': 1000,
+}
+
+NEO4J_POOL = {
+    'max_connection_pool_size': 50,
+    'connection_acquisition_timeout': 30.0,
+    'max_connection_lifetime': 3600,
+    'connection_timeout': 5.0,
+    'query_timeout': 30.0,
+    'fetch_size': 1000,
+}
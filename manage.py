@@ -0,0 +1,145 @@
+import argparse
+import sys
+
+
+def init(args):
+    from services import coauthor_service, keyword_score_service, mongodb_service, neo4j_schema, ranking_service
+
+    if ranking_service.ensure_alias_table():
+        print("university_alias created")
+    if coauthor_service.ensure_edge_table():
+        print("coauthor_edge created")
+    if keyword_score_service.ensure_score_table():
+        print("university_keyword_score created")
+    mongodb_service.ensure_indexes()
+    print("MongoDB indexes ensured")
+    neo4j_schema.ensure_schema()
+    print("Neo4j indexes and constraints ensured")
+
+
+def check_query_plans(args):
+    from services.neo4j_schema import QueryPlanError, check_query_plans as check
+
+    try:
+        plans = check()
+    except QueryPlanError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    for name, operators in plans.items():
+        print(f"{name}: {', '.join(sorted(operators))}")
+    print("All hot-path Neo4j queries use indexes")
+
+
+def refresh_yearly_rankings(args):
+    from services.neo4j_service import refresh_institute_year_stats
+    from services.result_cache import bump_data_version
+
+    years = refresh_institute_year_stats(years=args.year or None)
+    bump_data_version('yearly_rankings')
+    print(f"Yearly ranking summary refreshed for {years} years")
+
+
+def refresh_keyword_rollup(args):
+    from services.keyword_analytics import refresh_keyword_trend_metrics
+    from services.mongodb_service import refresh_keyword_year_counts
+
+    processed = refresh_keyword_year_counts(full=args.full)
+    print(f"keyword_year_counts refreshed: {processed} publications processed")
+    keywords = refresh_keyword_trend_metrics()
+    print(f"keyword_trend_metrics refreshed: {keywords} keywords")
+
+
+def rebuild_coauthor_edges(args):
+    from services.coauthor_service import rebuild_coauthor_edges as rebuild
+    from services.result_cache import bump_data_version
+
+    edges = rebuild()
+    bump_data_version('publications')
+    print(f"coauthor_edge rebuilt: {edges} edges")
+
+
+def rebuild_keyword_scores(args):
+    from services.keyword_score_service import (rebuild_university_keyword_scores,
+                                                refresh_university_keyword_scores)
+
+    if args.university:
+        rows = refresh_university_keyword_scores(args.university)
+    else:
+        rows = rebuild_university_keyword_scores()
+    print(f"university_keyword_score refreshed: {rows} rows written")
+
+
+def build_expertise_index(args):
+    from services.expertise_index import build_index
+
+    faculty_count, keyword_count = build_index()
+    print(f"Expertise index built: {faculty_count} faculty over {keyword_count} keywords")
+
+
+def set_alias(args):
+    from services.ranking_service import set_manual_alias
+
+    set_manual_alias(args.source_name, args.university_name)
+    print(f"Alias saved: {args.source_name!r} -> {args.university_name!r}")
+
+
+def clear_aliases(args):
+    from services.ranking_service import clear_fuzzy_aliases
+
+    print(f"{clear_fuzzy_aliases()} fuzzy aliases cleared")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintenance commands for the Academic Insights dashboard")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    init_parser = subparsers.add_parser('init',
+                                        help="Create the MySQL tables and the database indexes the dashboard relies on")
+    init_parser.set_defaults(func=init)
+
+    plans_parser = subparsers.add_parser('check-query-plans',
+                                         help="EXPLAIN registered Neo4j queries and fail if a hot path full-scans")
+    plans_parser.set_defaults(func=check_query_plans)
+
+    rollup_parser = subparsers.add_parser('refresh-keyword-rollup',
+                                          help="Fold new MongoDB publications into the keyword_year_counts rollup and "
+                                               "recompute keyword trend metrics")
+    rollup_parser.add_argument('--full', action='store_true', help="Drop and rebuild the rollup from scratch")
+    rollup_parser.set_defaults(func=refresh_keyword_rollup)
+
+    yearly_parser = subparsers.add_parser('refresh-yearly-rankings',
+                                          help="Rebuild the per-(year, institute) counts behind Yearly Rankings")
+    yearly_parser.add_argument('--year', type=int, action='append',
+                               help="Only refresh this year (repeatable); defaults to all years")
+    yearly_parser.set_defaults(func=refresh_yearly_rankings)
+
+    coauthor_parser = subparsers.add_parser('rebuild-coauthor-edges',
+                                            help="Recreate the MySQL co-authorship edge table behind the collaboration viewer")
+    coauthor_parser.set_defaults(func=rebuild_coauthor_edges)
+
+    scores_parser = subparsers.add_parser('refresh-keyword-scores',
+                                          help="Rebuild the MySQL university_keyword_score rollup behind Top Keywords")
+    scores_parser.add_argument('--university', type=int, action='append',
+                               help="Only refresh this university id (repeatable); defaults to a full rebuild")
+    scores_parser.set_defaults(func=rebuild_keyword_scores)
+
+    expertise_parser = subparsers.add_parser('build-expertise-index',
+                                             help="Rebuild the on-disk faculty expertise index behind Expertise Search")
+    expertise_parser.set_defaults(func=build_expertise_index)
+
+    alias_parser = subparsers.add_parser('set-alias',
+                                         help="Map a ranking-file institution name to a university (manual override)")
+    alias_parser.add_argument('source_name', help="Institution name as it appears in the ranking file")
+    alias_parser.add_argument('university_name', help="Name of the university in the MySQL university table")
+    alias_parser.set_defaults(func=set_alias)
+
+    clear_parser = subparsers.add_parser('clear-aliases',
+                                         help="Forget fuzzy-matched aliases so the next upload re-scores them")
+    clear_parser.set_defaults(func=clear_aliases)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
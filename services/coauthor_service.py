@@ -0,0 +1,99 @@
+import pandas as pd
+
+from services import result_cache
+from services.mysql_service import mysql_engine, require_table, table_exists
+from sqlalchemy import text
+
+# Precomputed co-authorship edges. Every pair of faculty sharing a publication is stored in both
+# directions with the publication's citation count, so the Collaboration Viewer's "top N co-authors
+# within/outside the university" is a single range read on the primary key
+# (faculty_id, same_university, num_citations, ...) instead of a 7-way self-join.
+# num_citations is copied into the key when an edge is written, so changes to publication.num_citations
+# made outside the dashboard only show up after `python manage.py rebuild-coauthor-edges`.
+EDGE_TABLE = 'coauthor_edge'
+
+CREATE_EDGE_TABLE = f'''
+CREATE TABLE IF NOT EXISTS {EDGE_TABLE} (
+  faculty_id INT NOT NULL,
+  same_university TINYINT(1) NOT NULL,
+  num_citations INT NOT NULL,
+  coauthor_id INT NOT NULL,
+  publication_id INT NOT NULL,
+  PRIMARY KEY (faculty_id, same_university, num_citations, coauthor_id, publication_id),
+  KEY coauthor_edge_publication (publication_id)
+)
+'''
+
+# Edges for the publications matched by {publication_filter}; DISTINCT drops duplicate
+# faculty_publication rows, which the old query also collapsed.
+INSERT_EDGES_QUERY = f'''
+INSERT IGNORE INTO {EDGE_TABLE} (faculty_id, same_university, num_citations, coauthor_id, publication_id)
+SELECT DISTINCT fp1.faculty_id, f1.university_id <=> f2.university_id, COALESCE(p.num_citations, 0),
+       fp2.faculty_id, p.id
+FROM faculty_publication fp1
+JOIN faculty_publication fp2 ON fp2.publication_id = fp1.publication_id AND fp2.faculty_id <> fp1.faculty_id
+JOIN publication p ON p.id = fp1.publication_id
+JOIN faculty f1 ON f1.id = fp1.faculty_id
+JOIN faculty f2 ON f2.id = fp2.faculty_id
+{{publication_filter}}
+'''
+
+# All co-authors of one faculty member, in (same_university, num_citations) key order
+COAUTHORS_QUERY = f'''
+SELECT e.same_university, f1.name AS faculty1, f2.name AS faculty2, u2.name AS university,
+p.title AS publication, p.year, e.num_citations
+FROM {EDGE_TABLE} e
+JOIN faculty f1 ON f1.id = e.faculty_id
+JOIN faculty f2 ON f2.id = e.coauthor_id
+JOIN university u2 ON u2.id = f2.university_id
+JOIN publication p ON p.id = e.publication_id
+WHERE e.faculty_id = :faculty_id
+AND f1.university_id = :university_id
+ORDER BY e.same_university, e.num_citations ASC
+'''
+
+
+def rebuild_coauthor_edges():
+    """Recreate the whole edge table from faculty_publication; returns the number of edges."""
+    with mysql_engine.begin() as connection:
+        connection.execute(text(CREATE_EDGE_TABLE))
+        connection.execute(text(f"DELETE FROM {EDGE_TABLE}"))
+        result = connection.execute(text(INSERT_EDGES_QUERY.format(publication_filter='')))
+    return result.rowcount
+
+
+def ensure_edge_table():
+    """Create and fill the edge table if it does not exist yet; returns True if it had to be built."""
+    with mysql_engine.connect() as connection:
+        if table_exists(connection, EDGE_TABLE):
+            return False
+    rebuild_coauthor_edges()
+    return True
+
+
+def refresh_publication_edges(connection, publication_id):
+    """Recompute the edges of one publication inside the caller's transaction."""
+    with require_table(EDGE_TABLE):
+        connection.execute(text(f"DELETE FROM {EDGE_TABLE} WHERE publication_id = :pub_id"),
+                           {"pub_id": publication_id})
+    connection.execute(text(INSERT_EDGES_QUERY.format(publication_filter='WHERE fp1.publication_id = :pub_id')),
+                       {"pub_id": publication_id})
+
+
+@result_cache.cached('coauthors', depends_on=('publications',))
+def get_coauthor_set(faculty_id, university_id):
+    """Every shared publication of a faculty member with the co-author on each, least-cited first.
+
+    Cached per faculty member, so switching within/outside university or changing the number of
+    records only slices this frame (see select_coauthors) instead of querying again.
+    """
+    with mysql_engine.connect() as connection, require_table(EDGE_TABLE):
+        result = connection.execute(text(COAUTHORS_QUERY), {"faculty_id": faculty_id, "university_id": university_id})
+        return pd.DataFrame(result.fetchall(), columns=["same_university", "Faculty1", "Faculty2", "University",
+                                                        "Publication", "Year", "num_citations"])
+
+
+def select_coauthors(coauthors, same_university, limit):
+    """The first ``limit`` rows of a co-author set for one side of the within/outside-university split."""
+    rows = coauthors[coauthors['same_university'] == int(same_university)]
+    return rows.drop(columns='same_university').head(limit)
@@ -0,0 +1,119 @@
+import math
+
+from services.neo4j_service import neo4j_session, timed
+
+# N-hop collaboration network around one faculty member, traversed in Neo4j. Each hop is a bounded
+# variable-length expansion (FACULTY)-[:PUBLISH*2]-(FACULTY) from the current frontier, so the
+# traversal visits each faculty member once instead of enumerating every path of length 2N, and
+# the caps below keep highly connected faculty interactive.
+MAX_HOPS = 3
+MAX_NODES = 250
+MAX_EDGES = 1000
+# Strongest co-authors (by shared publications) followed from each faculty member per hop
+MAX_COAUTHORS_PER_FACULTY = 25
+
+# The graph identifies faculty only by name and institute; a second match means the start node is
+# ambiguous, so two records are enough to tell
+START_QUERY = """
+    MATCH (f:FACULTY {name: $faculty})-[:AFFILIATION_WITH]->(u:INSTITUTE {name: $institute})
+    RETURN DISTINCT elementId(f) AS id, f.name AS name, u.name AS institute
+    LIMIT 2
+"""
+
+HOP_QUERY = """
+    UNWIND $frontier AS source_id
+    MATCH (a:FACULTY) WHERE elementId(a) = source_id
+    MATCH (a)-[:PUBLISH*2]-(b:FACULTY)
+    WHERE b <> a
+    WITH a, b, COUNT(*) AS weight
+    ORDER BY weight DESC
+    WITH a, COLLECT({node: b, weight: weight})[..$per_faculty] AS coauthors
+    UNWIND coauthors AS coauthor
+    WITH a, coauthor.node AS b, coauthor.weight AS weight
+    OPTIONAL MATCH (b)-[:AFFILIATION_WITH]->(u:INSTITUTE)
+    RETURN elementId(a) AS source, elementId(b) AS target, b.name AS name, u.name AS institute, weight
+"""
+
+
+def _place(nodes, new_ids, parents, hop):
+    # Concentric layout: hop N sits on the circle of radius N, each node within the angular slice
+    # of the node it was reached from, so earlier hops keep their positions as the network grows
+    if hop == 0:
+        for node_id in new_ids:
+            nodes[node_id].update(angle=0.0, x=0.0, y=0.0)
+        return
+
+    previous = sum(1 for node in nodes.values() if node['hop'] == hop - 1)
+    width = 2 * math.pi / max(1, previous)
+    children = {}
+    for node_id in new_ids:
+        children.setdefault(parents[node_id], []).append(node_id)
+    for parent_id, child_ids in children.items():
+        base = nodes[parent_id]['angle'] if hop > 1 else 0.0
+        span = width if hop > 1 else 2 * math.pi
+        for i, node_id in enumerate(child_ids):
+            angle = base + span * ((i + 0.5) / len(child_ids) - (0.5 if hop > 1 else 0.0))
+            nodes[node_id].update(angle=angle, x=hop * math.cos(angle), y=hop * math.sin(angle))
+
+
+def _snapshot(nodes, edges, hop, truncated):
+    return {'nodes': list(nodes.values()),
+            'edges': [{'source': a, 'target': b, 'weight': w} for (a, b), w in edges.items()],
+            'hops': hop, 'truncated': truncated}
+
+
+def expand_network(faculty, institute, hops, report=None):
+    """Collaboration network within ``hops`` co-authorship hops of a faculty member.
+
+    Returns ``{'nodes': [...], 'edges': [...], 'hops': n, 'truncated': bool}``; nodes carry a
+    precomputed ``x``/``y`` layout position. When run as a background job, each completed hop is
+    published through ``report(partial=...)`` so the UI can draw the network as it grows. Raises
+    ValueError when the name matches more than one faculty member of the institute. Stops after the
+    current hop once ``report.cancelled()`` is true.
+    """
+    hops = max(1, min(MAX_HOPS, int(hops)))
+    nodes = {}
+    edges = {}
+    truncated = False
+    with neo4j_session() as session:
+        matches = list(session.run(timed(START_QUERY), faculty=faculty, institute=institute))
+        if not matches:
+            return _snapshot(nodes, edges, 0, truncated)
+        if len(matches) > 1:
+            raise ValueError(f"Several faculty members named {faculty} work at {institute} in the graph")
+        start = matches[0]
+        nodes[start['id']] = {'id': start['id'], 'name': start['name'], 'institute': start['institute'], 'hop': 0}
+        _place(nodes, [start['id']], {}, 0)
+
+        frontier = [start['id']]
+        for hop in range(1, hops + 1):
+            # A newer selection replaced this job (see job_service.cancel); stop between hops
+            if not frontier or truncated or (report is not None and report.cancelled()):
+                break
+            new_ids = []
+            parents = {}
+            records = session.run(timed(HOP_QUERY), frontier=frontier, per_faculty=MAX_COAUTHORS_PER_FACULTY)
+            for record in records:
+                source, target = record['source'], record['target']
+                if target not in nodes:
+                    if len(nodes) >= MAX_NODES:
+                        truncated = True
+                        continue
+                    nodes[target] = {'id': target, 'name': record['name'], 'institute': record['institute'],
+                                     'hop': hop}
+                    parents[target] = source
+                    new_ids.append(target)
+                key = (min(source, target), max(source, target))
+                if key not in edges:
+                    if len(edges) >= MAX_EDGES:
+                        truncated = True
+                        continue
+                    edges[key] = record['weight']
+
+            _place(nodes, new_ids, parents, hop)
+            frontier = new_ids
+            if report is not None:
+                report(progress=100 * hop / hops, message=f"{len(nodes)} faculty within {hop} hop(s)",
+                       partial=_snapshot(nodes, edges, hop, truncated))
+
+    return _snapshot(nodes, edges, hops, truncated)
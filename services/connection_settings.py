@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+
+from flask import jsonify
+from pymongo.monitoring import ConnectionPoolListener
+from config.pool_config import MYSQL_POOL, MONGODB_POOL, NEO4J_POOL
+
+DEFAULTS = {
+    'mysql': MYSQL_POOL,
+    'mongodb': MONGODB_POOL,
+    'neo4j': NEO4J_POOL,
+}
+
+SETTINGS_FILE = os.environ.get('DB_SETTINGS_FILE', os.path.join('config', 'connection_settings.json'))
+
+
+def _coerce(value, default):
+    # Environment values are strings; convert them to the type of the default
+    if isinstance(default, bool):
+        return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
+
+
+def _load_file():
+    if not os.path.exists(SETTINGS_FILE):
+        return {}
+    with open(SETTINGS_FILE) as f:
+        return json.load(f)
+
+
+def load_settings(backend):
+    """Pool and timeout settings for ``backend`` ('mysql', 'mongodb' or 'neo4j').
+
+    Precedence, lowest to highest: config/pool_config.py defaults, the DB_SETTINGS_FILE JSON file,
+    then <BACKEND>_<SETTING> environment variables.
+    """
+    defaults = DEFAULTS[backend]
+    settings = dict(defaults)
+    for key, value in _load_file().get(backend, {}).items():
+        if key not in defaults:
+            raise KeyError(f"Unknown {backend} connection setting in {SETTINGS_FILE}: {key}")
+        settings[key] = _coerce(value, defaults[key])
+    for key, default in defaults.items():
+        env_value = os.environ.get(f"{backend.upper()}_{key.upper()}")
+        if env_value is not None:
+            settings[key] = _coerce(env_value, default)
+    return settings
+
+
+class MongoPoolMonitor(ConnectionPoolListener):
+    """pymongo ConnectionPoolListener that tracks open and checked-out connections."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.checkout_failures = 0
+
+    def _add(self, field, delta):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + delta)
+
+    def connection_created(self, event):
+        self._add('open_connections', 1)
+
+    def connection_closed(self, event):
+        self._add('open_connections', -1)
+
+    def connection_checked_out(self, event):
+        self._add('checked_out', 1)
+
+    def connection_checked_in(self, event):
+        self._add('checked_out', -1)
+
+    def connection_check_out_failed(self, event):
+        self._add('checkout_failures', 1)
+
+    # The remaining ConnectionPoolListener hooks carry nothing we report
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+
+class SessionCounter:
+    """Counts open Neo4j sessions; each active session holds one pooled connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self.active -= 1
+
+
+mongo_pool_monitor = MongoPoolMonitor()
+neo4j_session_counter = SessionCounter()
+
+
+def get_pool_metrics():
+    """Live pool utilisation for every backend, alongside the configured limits."""
+    # Imported here because mysql_service itself reads its settings from this module
+    from services.mysql_service import mysql_engine
+
+    mysql_settings = load_settings('mysql')
+    mongo_settings = load_settings('mongodb')
+    neo4j_settings = load_settings('neo4j')
+    pool = mysql_engine.pool
+    return {
+        'mysql': {
+            'pool_size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+            'max_connections': mysql_settings['pool_size'] + mysql_settings['max_overflow'],
+        },
+        'mongodb': {
+            'open_connections': mongo_pool_monitor.open_connections,
+            'checked_out': mongo_pool_monitor.checked_out,
+            'checkout_failures': mongo_pool_monitor.checkout_failures,
+            'max_connections': mongo_settings['max_pool_size'],
+        },
+        'neo4j': {
+            'active_sessions': neo4j_session_counter.active,
+            'peak_sessions': neo4j_session_counter.peak,
+            'max_connections': neo4j_settings['max_connection_pool_size'],
+        },
+    }
+
+
+def register_routes(server):
+    server.add_url_rule('/pool-stats', 'pool_stats', lambda: jsonify(get_pool_metrics()))
@@ -0,0 +1,197 @@
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from services.mysql_service import mysql_engine
+from sqlalchemy import text
+
+# Nearest-neighbour search over faculty expertise. Each faculty member is a sparse vector of keyword
+# scores (faculty_keyword.score) weighted by inverse document frequency and L2-normalised, so the
+# dot product of two vectors is their cosine similarity. The vectors are stored twice:
+#   - by faculty (CSR: faculty_indptr / faculty_keywords / faculty_weights) to read a query vector
+#   - by keyword, as an inverted index (keyword_indptr / keyword_faculty / keyword_weights), so a
+#     query only touches the postings of its own keywords
+# The arrays are written as .npy files by `python manage.py build-expertise-index` and opened with
+# mmap_mode='r', so every worker process shares the same pages and startup needs no rebuild.
+INDEX_DIR = os.environ.get('EXPERTISE_INDEX_DIR', os.path.join('cache', 'expertise_index'))
+CURRENT_FILE = 'CURRENT'
+ARRAYS = ('faculty_ids', 'faculty_indptr', 'faculty_keywords', 'faculty_weights',
+          'keyword_indptr', 'keyword_faculty', 'keyword_weights')
+
+DEFAULT_TOP_K = 10
+# Builds kept on disk besides the current one, so workers still reading an older build keep working
+KEEP_OLD_BUILDS = 1
+
+SCORES_QUERY = """
+    SELECT fk.faculty_id, fk.keyword_id, fk.score
+    FROM faculty_keyword fk
+    WHERE fk.score > 0
+"""
+
+KEYWORDS_QUERY = "SELECT id, name FROM keyword"
+
+
+def _write_build(faculty_ids, matrix, keywords):
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    name = f"build-{time.time_ns()}"
+    path = os.path.join(INDEX_DIR, name)
+    os.makedirs(path)
+
+    inverted = matrix.tocsc()
+    arrays = {
+        'faculty_ids': faculty_ids.astype(np.int64),
+        'faculty_indptr': matrix.indptr.astype(np.int64),
+        'faculty_keywords': matrix.indices.astype(np.int32),
+        'faculty_weights': matrix.data.astype(np.float32),
+        'keyword_indptr': inverted.indptr.astype(np.int64),
+        'keyword_faculty': inverted.indices.astype(np.int32),
+        'keyword_weights': inverted.data.astype(np.float32),
+    }
+    for array_name, array in arrays.items():
+        np.save(os.path.join(path, f"{array_name}.npy"), array)
+    with open(os.path.join(path, 'keywords.json'), 'w') as f:
+        json.dump(keywords, f)
+
+    # Switch readers to the new build atomically, then drop builds older than the previous one
+    current = os.path.join(INDEX_DIR, CURRENT_FILE)
+    with open(f"{current}.tmp", 'w') as f:
+        f.write(name)
+    os.replace(f"{current}.tmp", current)
+    builds = sorted(entry for entry in os.listdir(INDEX_DIR) if entry.startswith('build-') and entry != name)
+    for old in builds[:max(0, len(builds) - KEEP_OLD_BUILDS)]:
+        shutil.rmtree(os.path.join(INDEX_DIR, old), ignore_errors=True)
+    return path
+
+
+def build_index():
+    """Rebuild the on-disk index from faculty_keyword; returns ``(faculty count, keyword count)``."""
+    with mysql_engine.connect() as connection:
+        scores = pd.read_sql_query(text(SCORES_QUERY), connection)
+        keyword_rows = connection.execute(text(KEYWORDS_QUERY)).fetchall()
+
+    faculty_ids, rows = np.unique(scores['faculty_id'].to_numpy(), return_inverse=True)
+    keyword_ids, columns = np.unique(scores['keyword_id'].to_numpy(), return_inverse=True)
+    matrix = sp.csr_matrix((scores['score'].to_numpy(dtype=np.float64), (rows, columns)),
+                           shape=(len(faculty_ids), len(keyword_ids)))
+    matrix.sum_duplicates()
+
+    # Down-weight keywords that almost every faculty member has, then L2-normalise each row
+    document_frequency = np.bincount(matrix.indices, minlength=len(keyword_ids))
+    idf = np.log((1 + len(faculty_ids)) / (1 + document_frequency)) + 1.0
+    matrix = sp.csr_matrix(matrix @ sp.diags(idf))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = sp.csr_matrix(sp.diags(1.0 / norms) @ matrix)
+    matrix.sort_indices()
+
+    names = dict(keyword_rows)
+    _write_build(faculty_ids, matrix, [names.get(int(keyword_id), str(keyword_id)) for keyword_id in keyword_ids])
+    return len(faculty_ids), len(keyword_ids)
+
+
+class ExpertiseIndex:
+    """Read-only view over one on-disk build, with the arrays memory-mapped."""
+
+    def __init__(self, path):
+        self.path = path
+        for array_name in ARRAYS:
+            setattr(self, array_name, np.load(os.path.join(path, f"{array_name}.npy"), mmap_mode='r'))
+        with open(os.path.join(path, 'keywords.json')) as f:
+            self.keywords = json.load(f)
+        self._keyword_column = {keyword.lower(): column for column, keyword in enumerate(self.keywords)}
+        self._faculty_row = {int(faculty_id): row for row, faculty_id in enumerate(self.faculty_ids)}
+
+    def faculty_vector(self, faculty_id):
+        """``(keyword columns, weights)`` of a faculty member, or None if they have no keywords."""
+        row = self._faculty_row.get(int(faculty_id))
+        if row is None:
+            return None
+        start, end = self.faculty_indptr[row], self.faculty_indptr[row + 1]
+        return np.asarray(self.faculty_keywords[start:end]), np.asarray(self.faculty_weights[start:end])
+
+    def keyword_vector(self, keywords):
+        """Query vector for free-text keywords; returns ``(columns, weights, unknown keywords)``."""
+        columns = []
+        unknown = []
+        for keyword in keywords:
+            column = self._keyword_column.get(keyword.strip().lower())
+            if column is None:
+                unknown.append(keyword)
+            elif column not in columns:
+                columns.append(column)
+        weights = np.full(len(columns), 1.0 / np.sqrt(len(columns)) if columns else 0.0, dtype=np.float32)
+        return np.asarray(columns, dtype=np.int32), weights, unknown
+
+    def search(self, columns, weights, k=DEFAULT_TOP_K, exclude=None):
+        """Top ``k`` faculty by cosine similarity to the query vector ``(columns, weights)``.
+
+        Returns ``[(faculty_id, similarity, [shared keywords])]``, best match first.
+        """
+        scores = np.zeros(len(self.faculty_ids), dtype=np.float32)
+        for column, weight in zip(columns, weights):
+            start, end = self.keyword_indptr[column], self.keyword_indptr[column + 1]
+            scores[self.keyword_faculty[start:end]] += weight * self.keyword_weights[start:end]
+        if exclude is not None and int(exclude) in self._faculty_row:
+            scores[self._faculty_row[int(exclude)]] = 0.0
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) == 0:
+            return []
+        k = min(k, len(candidates))
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+
+        query = dict(zip(columns.tolist(), weights.tolist()))
+        results = []
+        for row in top:
+            start, end = self.faculty_indptr[row], self.faculty_indptr[row + 1]
+            contributions = [(query[column] * float(weight), column) for column, weight in
+                             zip(self.faculty_keywords[start:end].tolist(), self.faculty_weights[start:end])
+                             if column in query]
+            shared = [self.keywords[column] for _, column in sorted(contributions, reverse=True)[:3]]
+            results.append((int(self.faculty_ids[row]), float(scores[row]), shared))
+        return results
+
+
+_lock = threading.Lock()
+_index = None
+
+
+def get_index():
+    """The current build, re-opened when a newer build has been published; None if none was built yet."""
+    global _index
+    try:
+        with open(os.path.join(INDEX_DIR, CURRENT_FILE)) as f:
+            path = os.path.join(INDEX_DIR, f.read().strip())
+    except OSError:
+        return None
+    with _lock:
+        if _index is None or _index.path != path:
+            _index = ExpertiseIndex(path)
+        return _index
+
+
+def similar_to_faculty(faculty_id, k=DEFAULT_TOP_K):
+    """Faculty with the most similar expertise to ``faculty_id``; None if the index is not built."""
+    index = get_index()
+    if index is None:
+        return None
+    vector = index.faculty_vector(faculty_id)
+    if vector is None:
+        return []
+    return index.search(*vector, k=k, exclude=faculty_id)
+
+
+def similar_to_keywords(keywords, k=DEFAULT_TOP_K):
+    """``(results, unknown keywords)`` for a free-text keyword list; None if the index is not built."""
+    index = get_index()
+    if index is None:
+        return None
+    columns, weights, unknown = index.keyword_vector(keywords)
+    return index.search(columns, weights, k=k), unknown
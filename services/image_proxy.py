@@ -0,0 +1,173 @@
+import hashlib
+import hmac
+import io
+import os
+import threading
+
+import requests
+
+from config.app_config import IMAGE_PROXY_SECRET
+from flask import Response, abort, redirect, request
+from PIL import Image, UnidentifiedImageError
+from requests.adapters import HTTPAdapter
+from services.photo_service import FALLBACK_PHOTO_URL
+from urllib.parse import urlencode, urlparse
+
+# External faculty photos and university logos are fetched once, shrunk to a thumbnail and served
+# from a local content-addressed disk cache:
+#   CACHE_DIR/urls/<sha256(url)>   -> name of the thumbnail blob for that URL
+#   CACHE_DIR/blobs/<sha256(data)>.<ext> -> thumbnail bytes
+# Blobs are evicted least-recently-used (by mtime, touched on every hit) once the cache exceeds
+# MAX_CACHE_BYTES.
+CACHE_DIR = os.environ.get('IMAGE_CACHE_DIR', os.path.join('cache', 'images'))
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+THUMBNAIL_SIZE = (400, 400)
+MAX_SOURCE_BYTES = 10 * 1024 * 1024
+REQUEST_TIMEOUT_SECONDS = 5
+BROWSER_CACHE_SECONDS = 7 * 24 * 3600
+
+ROUTE = '/image-proxy'
+
+# Proxied URLs are signed so the route cannot be used as an open proxy. The key comes from
+# config/app_config.py and is shared by all worker processes; register_routes refuses to start without it.
+_secret = IMAGE_PROXY_SECRET.encode()
+
+_session = requests.Session()
+_session.mount('http://', HTTPAdapter(pool_maxsize=8))
+_session.mount('https://', HTTPAdapter(pool_maxsize=8))
+
+_eviction_lock = threading.Lock()
+
+
+def _sign(url):
+    return hmac.new(_secret, url.encode(), hashlib.sha256).hexdigest()
+
+
+def proxied_url(url):
+    """Return the local thumbnail URL for an external image, or ``url`` unchanged if it can't be proxied."""
+    if not url or urlparse(url).scheme not in ('http', 'https'):
+        return url
+    return f"{ROUTE}?{urlencode({'url': url, 'sig': _sign(url)})}"
+
+
+def _url_index_path(url):
+    return os.path.join(CACHE_DIR, 'urls', hashlib.sha256(url.encode()).hexdigest())
+
+
+def _blob_path(blob_name):
+    return os.path.join(CACHE_DIR, 'blobs', blob_name)
+
+
+def _lookup(url):
+    try:
+        with open(_url_index_path(url)) as f:
+            blob_name = f.read().strip()
+        path = _blob_path(blob_name)
+        os.utime(path)
+        return blob_name, path
+    except OSError:
+        return None
+
+
+def _make_thumbnail(data):
+    with Image.open(io.BytesIO(data)) as image:
+        image.thumbnail(THUMBNAIL_SIZE)
+        output = io.BytesIO()
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image.save(output, format='PNG', optimize=True)
+            return output.getvalue(), 'png'
+        image.convert('RGB').save(output, format='JPEG', quality=85, optimize=True)
+        return output.getvalue(), 'jpg'
+
+
+def _fetch(url):
+    response = _session.get(url, timeout=REQUEST_TIMEOUT_SECONDS, stream=True)
+    try:
+        response.raise_for_status()
+        if 'image' not in response.headers.get('Content-Type', ''):
+            raise ValueError(f"Not an image: {url}")
+        data = io.BytesIO()
+        for block in response.iter_content(64 * 1024):
+            data.write(block)
+            if data.tell() > MAX_SOURCE_BYTES:
+                raise ValueError(f"Image too large: {url}")
+        return data.getvalue()
+    finally:
+        response.close()
+
+
+def _evict():
+    blobs_dir = os.path.join(CACHE_DIR, 'blobs')
+    with _eviction_lock:
+        entries = []
+        for entry in os.scandir(blobs_dir):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= MAX_CACHE_BYTES:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+
+def _store(url, thumbnail, extension):
+    blob_name = f"{hashlib.sha256(thumbnail).hexdigest()}.{extension}"
+    os.makedirs(os.path.join(CACHE_DIR, 'blobs'), exist_ok=True)
+    os.makedirs(os.path.join(CACHE_DIR, 'urls'), exist_ok=True)
+
+    # Write to a temp file and rename so concurrent readers never see a partial file
+    path = _blob_path(blob_name)
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(thumbnail)
+        os.replace(tmp_path, path)
+    index_path = _url_index_path(url)
+    tmp_path = f"{index_path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(blob_name)
+    os.replace(tmp_path, index_path)
+
+    _evict()
+    return blob_name, path
+
+
+def get_thumbnail(url):
+    """Return ``(blob_name, path)`` of the cached thumbnail for ``url``, fetching it on a miss."""
+    cached = _lookup(url)
+    if cached is not None:
+        return cached
+    thumbnail, extension = _make_thumbnail(_fetch(url))
+    return _store(url, thumbnail, extension)
+
+
+def serve_image():
+    url = request.args.get('url', '')
+    if not hmac.compare_digest(request.args.get('sig', ''), _sign(url)):
+        abort(403)
+
+    try:
+        blob_name, path = get_thumbnail(url)
+    except (requests.exceptions.RequestException, ValueError, UnidentifiedImageError, OSError):
+        return redirect(FALLBACK_PHOTO_URL)
+
+    etag = blob_name.split('.')[0]
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        with open(path, 'rb') as f:
+            response = Response(f.read(), mimetype='image/png' if blob_name.endswith('.png') else 'image/jpeg')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={BROWSER_CACHE_SECONDS}'
+    return response
+
+
+def register_routes(server):
+    if not _secret:
+        raise RuntimeError("IMAGE_PROXY_SECRET is not set; set it in config/app_config.py or the environment "
+                           "to the same value for every worker process.")
+    server.add_url_rule(ROUTE, 'image_proxy', serve_image)
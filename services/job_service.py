@@ -0,0 +1,130 @@
+import pickle
+import threading
+import time
+import traceback
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
+from config.cache_config import RESULT_CACHE_PATH
+from services.result_cache import connect_sqlite
+
+# Long-running work (e.g. ranking uploads) runs here instead of inside a Dash callback, so the worker
+# serving the callback returns immediately and the UI polls get_job() for progress.
+# A job runs in the process that submitted it, but its status, progress and result are kept in the
+# sqlite file shared with the result cache, so a poll that reaches another worker process on the
+# same host still sees it.
+# Worker threads per queue; collaboration network traversals get their own queue so they never delay
+# ranking uploads
+QUEUES = {'default': 2, 'network': 2}
+
+# Finished jobs are forgotten after this many seconds
+JOB_RETENTION_SECONDS = 3600
+
+FINISHED_STATUSES = ('done', 'failed', 'cancelled')
+
+_executors = {queue: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'job-{queue}')
+              for queue, workers in QUEUES.items()}
+_local = threading.local()
+
+
+def _connect():
+    conn = connect_sqlite(_local, RESULT_CACHE_PATH)
+    if not getattr(_local, 'jobs_table', False):
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS jobs "
+                         "(id TEXT PRIMARY KEY, name TEXT, status TEXT, progress INTEGER, message TEXT, "
+                         "result BLOB, error TEXT, created_at REAL, updated_at REAL)")
+        _local.jobs_table = True
+    return conn
+
+
+def _update(job_id, **fields):
+    if 'result' in fields:
+        fields['result'] = pickle.dumps(fields['result'], protocol=pickle.HIGHEST_PROTOCOL)
+    fields['updated_at'] = time.time()
+    conn = _connect()
+    with conn:
+        # A cancelled job keeps its status whatever the job reports afterwards
+        conn.execute(f"UPDATE jobs SET {', '.join(f'{column} = ?' for column in fields)} "
+                     "WHERE id = ? AND status <> 'cancelled'", (*fields.values(), job_id))
+
+
+def _prune():
+    conn = _connect()
+    with conn:
+        conn.execute(f"DELETE FROM jobs WHERE status IN ({', '.join('?' for _ in FINISHED_STATUSES)}) "
+                     "AND updated_at < ?", (*FINISHED_STATUSES, time.time() - JOB_RETENTION_SECONDS))
+
+
+class Reporter:
+    """The ``report`` callable passed to a job; ``cancelled()`` tells the job to stop early."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+
+    def __call__(self, progress=None, message=None, partial=None):
+        fields = {}
+        if progress is not None:
+            fields['progress'] = max(0, min(100, int(progress)))
+        if message is not None:
+            fields['message'] = message
+        if partial is not None:
+            fields['result'] = partial
+        _update(self.job_id, **fields)
+
+    def cancelled(self):
+        row = _connect().execute("SELECT status FROM jobs WHERE id = ?", (self.job_id,)).fetchone()
+        return row is None or row[0] == 'cancelled'
+
+
+def _run(job_id, fn, args, kwargs):
+    report = Reporter(job_id)
+    if report.cancelled():
+        return
+    _update(job_id, status='running', message='Started')
+
+    try:
+        result = fn(*args, report=report, **kwargs)
+    except Exception as e:
+        traceback.print_exc()
+        _update(job_id, status='failed', error=str(e), message='Failed')
+    else:
+        _update(job_id, status='done', progress=100, result=result, message='Finished')
+
+
+def submit(name, fn, *args, queue='default', **kwargs):
+    """Run ``fn(*args, report=..., **kwargs)`` on one of the QUEUES in the background and return its job id.
+
+    ``fn`` receives a ``report(progress=None, message=None, partial=None)`` callable to publish
+    progress (0-100), a status message and, optionally, a partial result that get_job() returns
+    while the job is still running. Long jobs should check ``report.cancelled()`` between steps.
+    """
+    _prune()
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.execute("INSERT INTO jobs (id, name, status, progress, message, result, error, created_at, updated_at) "
+                     "VALUES (?, ?, 'queued', 0, 'Queued', NULL, NULL, ?, ?)", (job_id, name, now, now))
+    _executors[queue].submit(_run, job_id, fn, args, kwargs)
+    return job_id
+
+
+def cancel(job_id):
+    """Ask a queued or running job to stop; a queued job is skipped, a running one stops at its next check."""
+    conn = _connect()
+    with conn:
+        conn.execute("UPDATE jobs SET status = 'cancelled', message = 'Cancelled', updated_at = ? "
+                     "WHERE id = ? AND status IN ('queued', 'running')", (time.time(), job_id))
+
+
+def get_job(job_id):
+    """Snapshot of a job's state, or None if the id is unknown (or expired)."""
+    row = _connect().execute("SELECT id, name, status, progress, message, result, error, created_at, updated_at "
+                             "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = dict(zip(('id', 'name', 'status', 'progress', 'message', 'result', 'error', 'created_at', 'updated_at'),
+                   row))
+    job['result'] = pickle.loads(job['result']) if job['result'] is not None else None
+    return job
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+from pymongo import DESCENDING
+from services import result_cache
+from services.mongodb_service import db, mongo_settings, KEYWORD_ROLLUP_COLLECTION, REQUEST_TIMEOUT_MS
+
+# Trend metrics for every keyword at once, computed over the full year x keyword count matrix of the
+# keyword_year_counts rollup. All metrics are column-wise NumPy/pandas operations, and the trend
+# slopes come from a single statsmodels OLS fit with one column per keyword, so the cost grows with
+# the matrix size rather than with a Python loop over keywords. Results are precomputed into the
+# keyword_trend_metrics collection by `python manage.py refresh-keyword-rollup`.
+METRICS_COLLECTION = 'keyword_trend_metrics'
+
+# Years of history the growth metrics and trend slopes look at
+TREND_YEARS = 10
+ROLLING_WINDOW = 3
+# Keywords need this many publications over the trend years, and a slope this many standard errors
+# above zero, to be listed as emerging
+MIN_RECENT_COUNT = 20
+MIN_SLOPE_T = 3.0
+
+EMERGING_LIMIT = 25
+
+
+def load_count_matrix():
+    """Dense year x keyword publication count matrix of the whole rollup (missing years are 0)."""
+    documents = db[KEYWORD_ROLLUP_COLLECTION].find({}, projection={'_id': 0, 'keyword': 1, 'year': 1, 'count': 1},
+                                                   batch_size=mongo_settings['fetch_size'])
+    counts = pd.DataFrame(list(documents), columns=['keyword', 'year', 'count'])
+    counts = counts.dropna(subset=['keyword', 'year'])
+    matrix = counts.pivot_table(index='year', columns='keyword', values='count', aggfunc='sum', fill_value=0)
+    if matrix.empty:
+        return matrix
+    # Give every year in the span a row, so shifts and rolling windows step one calendar year
+    years = range(int(matrix.index.min()), int(matrix.index.max()) + 1)
+    return matrix.reindex(years, fill_value=0).astype(np.float64)
+
+
+def compute_trend_metrics(matrix, trend_years=TREND_YEARS, window=ROLLING_WINDOW):
+    """Per-keyword growth and trend metrics from a year x keyword count matrix.
+
+    Returns a DataFrame indexed by keyword with total and recent counts, the latest year-over-year
+    growth, the latest and previous ``window``-year rolling averages, the OLS trend slope (publications
+    per year) over the last ``trend_years`` years with its t statistic, the slope relative to the
+    keyword's recent mean, and ``emerging_score`` (the relative slope of keywords that pass the
+    MIN_RECENT_COUNT and MIN_SLOPE_T filters, NaN otherwise).
+    """
+    recent = matrix.tail(trend_years)
+    counts = recent.to_numpy()
+    years = recent.index.to_numpy(dtype=np.float64)
+
+    # Year-over-year growth of the latest year; a keyword absent the year before grows from 1
+    latest = matrix.iloc[-1].to_numpy()
+    previous = matrix.iloc[-2].to_numpy() if len(matrix) > 1 else np.zeros_like(latest)
+    yoy_growth = (latest - previous) / np.maximum(previous, 1.0)
+
+    rolling = matrix.rolling(window, min_periods=1).mean()
+    rolling_avg = rolling.iloc[-1].to_numpy()
+    previous_rolling_avg = rolling.iloc[-1 - window].to_numpy() if len(rolling) > window else np.zeros_like(latest)
+
+    # One least-squares fit for all keywords: endog has a column per keyword
+    if len(years) > 2:
+        fit = sm.OLS(counts, sm.add_constant(years - years.mean())).fit()
+        slope = np.asarray(fit.params)[1]
+        residual_variance = (np.asarray(fit.resid) ** 2).sum(axis=0) / fit.df_resid
+        slope_se = np.sqrt(residual_variance * fit.normalized_cov_params[1, 1])
+        # Least squares leaves rounding noise (~1e-17) in the slope of a flat series and in the standard
+        # error of an exact line; zero both relative to the keyword's level so noise is not a trend
+        tolerance = 1e-9 * np.maximum(np.abs(counts).mean(axis=0), 1.0)
+        slope = np.where(np.abs(slope) <= tolerance, 0.0, slope)
+        slope_se = np.where(slope_se <= tolerance, 0.0, slope_se)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # An exact line has no residual error: +/-inf for a rise or decline, 0 only when flat
+            slope_t = np.where(slope_se > 0, slope / slope_se,
+                               np.where(slope > 0, np.inf, np.where(slope < 0, -np.inf, 0.0)))
+    else:
+        slope = np.zeros(counts.shape[1])
+        slope_t = np.zeros(counts.shape[1])
+
+    recent_count = counts.sum(axis=0)
+    relative_slope = slope / np.maximum(counts.mean(axis=0), 1.0)
+    emerging = (recent_count >= MIN_RECENT_COUNT) & (slope_t >= MIN_SLOPE_T)
+
+    return pd.DataFrame({
+        'total_count': matrix.sum(axis=0).to_numpy(),
+        'recent_count': recent_count,
+        'latest_count': latest,
+        'yoy_growth': yoy_growth,
+        'rolling_avg': rolling_avg,
+        'previous_rolling_avg': previous_rolling_avg,
+        'slope': slope,
+        'slope_t': slope_t,
+        'relative_slope': relative_slope,
+        'emerging_score': np.where(emerging, relative_slope, np.nan),
+    }, index=matrix.columns)
+
+
+def refresh_keyword_trend_metrics():
+    """Recompute the metrics of every keyword and swap them into METRICS_COLLECTION; returns the keyword count."""
+    matrix = load_count_matrix()
+    if matrix.empty:
+        return 0
+    metrics = compute_trend_metrics(matrix)
+    metrics = metrics.replace([np.inf, -np.inf], np.nan)
+    metrics = metrics.astype(object).where(metrics.notna(), None)
+    metrics['latest_year'] = int(matrix.index.max())
+
+    # Write to a staging collection and rename it over the live one, so readers never see a partial set
+    staging = db[f"{METRICS_COLLECTION}_staging"]
+    staging.drop()
+    records = metrics.rename_axis('keyword').reset_index().to_dict('records')
+    for start in range(0, len(records), mongo_settings['fetch_size']):
+        staging.insert_many(records[start:start + mongo_settings['fetch_size']], ordered=False)
+    staging.create_index([('emerging_score', DESCENDING)])
+    staging.create_index('keyword', unique=True)
+    staging.rename(METRICS_COLLECTION, dropTarget=True)
+
+    result_cache.bump_data_version('keyword_trends')
+    return len(records)
+
+
+@result_cache.cached('emerging_keywords', depends_on=('keyword_trends',))
+def get_emerging_keywords(limit=EMERGING_LIMIT):
+    """The ``limit`` keywords with the highest emerging score, read from the precomputed metrics."""
+    documents = db[METRICS_COLLECTION].find({'emerging_score': {'$ne': None}}, projection={'_id': 0},
+                                            sort=[('emerging_score', DESCENDING)], limit=limit,
+                                            max_time_ms=REQUEST_TIMEOUT_MS)
+    return pd.DataFrame(list(documents))
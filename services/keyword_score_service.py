@@ -0,0 +1,83 @@
+import pandas as pd
+
+from services import result_cache
+from services.mysql_service import mysql_engine, require_table, table_exists
+from sqlalchemy import bindparam, text
+
+# Per-(university, keyword) rollup of faculty_keyword: the summed faculty score and the number of
+# faculty with the keyword. Top Keywords reads a university's rows through the
+# (university_id, total_score) index and the "which universities lead in keyword X" view reads
+# (keyword_id, total_score), instead of aggregating faculty_keyword ⋈ faculty on every request.
+SCORE_TABLE = 'university_keyword_score'
+
+CREATE_SCORE_TABLE = f'''
+CREATE TABLE IF NOT EXISTS {SCORE_TABLE} (
+  university_id INT NOT NULL,
+  keyword_id INT NOT NULL,
+  total_score DOUBLE NOT NULL,
+  faculty_count INT NOT NULL,
+  PRIMARY KEY (university_id, keyword_id),
+  KEY university_keyword_score_university (university_id, total_score),
+  KEY university_keyword_score_keyword (keyword_id, total_score)
+)
+'''
+
+INSERT_SCORES_QUERY = f'''
+INSERT INTO {SCORE_TABLE} (university_id, keyword_id, total_score, faculty_count)
+SELECT f.university_id, fk.keyword_id, SUM(fk.score), COUNT(DISTINCT fk.faculty_id)
+FROM faculty_keyword fk
+JOIN faculty f ON f.id = fk.faculty_id
+WHERE f.university_id IS NOT NULL {{university_filter}}
+GROUP BY f.university_id, fk.keyword_id
+'''
+
+KEYWORD_LEADERS_QUERY = f'''
+SELECT u.name AS university, s.total_score, s.faculty_count
+FROM keyword k
+JOIN {SCORE_TABLE} s ON s.keyword_id = k.id
+JOIN university u ON u.id = s.university_id
+WHERE k.name = :keyword
+ORDER BY s.total_score DESC
+LIMIT :limit
+'''
+
+
+def rebuild_university_keyword_scores():
+    """Recreate the whole rollup from faculty_keyword; returns the number of rows written."""
+    with mysql_engine.begin() as connection:
+        connection.execute(text(CREATE_SCORE_TABLE))
+        connection.execute(text(f"DELETE FROM {SCORE_TABLE}"))
+        result = connection.execute(text(INSERT_SCORES_QUERY.format(university_filter='')))
+    result_cache.bump_data_version('faculty_keywords')
+    return result.rowcount
+
+
+def ensure_score_table():
+    """Create and fill the rollup if it does not exist yet; returns True if it had to be built."""
+    with mysql_engine.connect() as connection:
+        if table_exists(connection, SCORE_TABLE):
+            return False
+    rebuild_university_keyword_scores()
+    return True
+
+
+def refresh_university_keyword_scores(university_ids):
+    """Recompute the rollup rows of ``university_ids`` only, e.g. after their faculty keywords changed."""
+    university_ids = [int(university_id) for university_id in university_ids]
+    if not university_ids:
+        return 0
+    with mysql_engine.begin() as connection:
+        connection.execute(text(f"DELETE FROM {SCORE_TABLE} WHERE university_id IN :ids")
+                           .bindparams(bindparam('ids', expanding=True)), {"ids": university_ids})
+        result = connection.execute(text(INSERT_SCORES_QUERY.format(university_filter='AND f.university_id IN :ids'))
+                                    .bindparams(bindparam('ids', expanding=True)), {"ids": university_ids})
+    result_cache.bump_data_version('faculty_keywords')
+    return result.rowcount
+
+
+@result_cache.cached('keyword_leaders', depends_on=('faculty_keywords',))
+def get_keyword_leaders(keyword, limit=10):
+    """The ``limit`` universities with the highest summed faculty score for ``keyword``."""
+    with mysql_engine.connect() as connection, require_table(SCORE_TABLE):
+        result = connection.execute(text(KEYWORD_LEADERS_QUERY), {"keyword": keyword, "limit": limit})
+        return pd.DataFrame(result.fetchall(), columns=['university', 'total_score', 'faculty_count'])
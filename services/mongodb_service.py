@@ -1,12 +1,32 @@
+import pandas as pd
+
 from pymongo import MongoClient
 from config.mongodb_config import MONGO_HOST, MONGO_PORT, MONGO_DB_NAME
+from services.connection_settings import load_settings, mongo_pool_monitor
+
+mongo_settings = load_settings('mongodb')
 
 # Connect to the MongoDB database
-client = MongoClient(f"mongodb://{MONGO_HOST}:{MONGO_PORT}/")
+client = MongoClient(f"mongodb://{MONGO_HOST}:{MONGO_PORT}/",
+                     maxPoolSize=mongo_settings['max_pool_size'],
+                     minPoolSize=mongo_settings['min_pool_size'],
+                     maxIdleTimeMS=mongo_settings['max_idle_time_ms'],
+                     waitQueueTimeoutMS=mongo_settings['wait_queue_timeout_ms'],
+                     serverSelectionTimeoutMS=mongo_settings['server_selection_timeout_ms'],
+                     connectTimeoutMS=mongo_settings['connect_timeout_ms'],
+                     event_listeners=[mongo_pool_monitor])
 db = client[MONGO_DB_NAME]
 
+# Server-side limit for reads made while serving a request (passed as max_time_ms / maxTimeMS). It is
+# not set on the client, so the rollup refreshes run by manage.py on the same client are unbounded.
+REQUEST_TIMEOUT_MS = mongo_settings['query_timeout_ms']
+
+
+# Materialized keyword-by-year rollup, maintained by refresh_keyword_year_counts()
+KEYWORD_ROLLUP_COLLECTION = 'keyword_year_counts'
+ROLLUP_STATE_COLLECTION = 'rollup_state'
+
 
-# Ensure indexes
 def ensure_index(collection, index_field):
     indexes = collection.index_information()
     index_name = f"{index_field}_1"
@@ -14,29 +34,80 @@ def ensure_index(collection, index_field):
         collection.create_index(index_field)
 
 
-ensure_index(db.publications, "keywords.name")
-ensure_index(db.publications, "year")
+# Ensure indexes; run explicitly via `python manage.py init`, never at import time
+def ensure_indexes():
+    ensure_index(db.publications, "keywords.name")
+    ensure_index(db.publications, "year")
+    if 'keyword_1_year_1' not in db[KEYWORD_ROLLUP_COLLECTION].index_information():
+        db[KEYWORD_ROLLUP_COLLECTION].create_index([('keyword', 1), ('year', 1)], unique=True)
 
 
 def get_keyword_options():
     faculty_collection = db['faculty']
-    keywords = faculty_collection.distinct('keywords.name')
+    keywords = faculty_collection.distinct('keywords.name', maxTimeMS=REQUEST_TIMEOUT_MS)
     return [{'label': k, 'value': k} for k in keywords]
 
 
-def get_keyword_trends_data(keywords):
+def refresh_keyword_year_counts(full=False):
+    """Fold publications added since the last run into the keyword_year_counts rollup.
+
+    Publications are processed in ``_id`` order, so only documents with an ``_id`` greater than the
+    last processed one are unwound and merged. ``full=True`` drops the rollup and rebuilds it.
+    Returns the number of publications processed.
+    """
     publications_collection = db['publications']
-    trends_data = {}
-
-    for keyword in keywords:
-        keyword_counts = publications_collection.aggregate([
-            {'$match': {'keywords.name': keyword}},
-            {'$unwind': '$keywords'},
-            {'$match': {'keywords.name': keyword}},
-            {'$group': {'_id': '$year', 'count': {'$sum': 1}}},
-            {'$sort': {'_id': 1}}
-        ])
-        years, counts = zip(*[(item['_id'], item['count']) for item in keyword_counts])
-        trends_data[keyword] = {'years': years, 'counts': counts}
-
-    return trends_data
+    state_collection = db[ROLLUP_STATE_COLLECTION]
+
+    if full:
+        db[KEYWORD_ROLLUP_COLLECTION].delete_many({})
+        state_collection.delete_one({'_id': KEYWORD_ROLLUP_COLLECTION})
+
+    state = state_collection.find_one({'_id': KEYWORD_ROLLUP_COLLECTION}) or {}
+    id_range = {}
+    if state.get('last_id') is not None:
+        id_range['$gt'] = state['last_id']
+
+    # Pin the upper bound so publications inserted while the merge runs are picked up next time
+    newest = publications_collection.find_one(
+        {'_id': id_range} if id_range else {}, sort=[('_id', -1)], projection={'_id': 1})
+    if newest is None:
+        return 0
+    id_range['$lte'] = newest['_id']
+
+    processed = publications_collection.count_documents({'_id': id_range})
+    publications_collection.aggregate([
+        {'$match': {'_id': id_range}},
+        {'$unwind': '$keywords'},
+        {'$group': {'_id': {'keyword': '$keywords.name', 'year': '$year'}, 'count': {'$sum': 1}}},
+        {'$project': {'_id': 0, 'keyword': '$_id.keyword', 'year': '$_id.year', 'count': 1}},
+        {'$merge': {
+            'into': KEYWORD_ROLLUP_COLLECTION,
+            'on': ['keyword', 'year'],
+            'whenMatched': [{'$set': {'count': {'$add': ['$count', '$$new.count']}}}],
+            'whenNotMatched': 'insert',
+        }},
+    ])
+
+    state_collection.update_one({'_id': KEYWORD_ROLLUP_COLLECTION},
+                                {'$set': {'last_id': newest['_id']}}, upsert=True)
+    return processed
+
+
+def get_keyword_trends_data(keywords):
+    rollup_collection = db[KEYWORD_ROLLUP_COLLECTION]
+
+    # Point lookup on the (keyword, year) index of the precomputed rollup
+    keyword_counts = rollup_collection.find({'keyword': {'$in': list(keywords)}},
+                                            projection={'_id': 0, 'keyword': 1, 'year': 1, 'count': 1},
+                                            batch_size=mongo_settings['fetch_size'],
+                                            max_time_ms=REQUEST_TIMEOUT_MS)
+    counts = pd.DataFrame(
+        [(item['keyword'], item['year'], item['count']) for item in keyword_counts],
+        columns=['keyword', 'year', 'count'])
+
+    # Dense year x keyword matrix: every keyword shares the same year axis, missing years count as 0
+    matrix = counts.pivot_table(index='year', columns='keyword', values='count', aggfunc='sum', fill_value=0)
+    matrix = matrix.reindex(columns=list(keywords), fill_value=0).sort_index()
+
+    years = tuple(matrix.index)
+    return {keyword: {'years': years, 'counts': tuple(int(c) for c in matrix[keyword])} for keyword in keywords}
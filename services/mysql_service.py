@@ -1,32 +1,96 @@
 import pandas as pd
-from sqlalchemy import create_engine, text, exc
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, text, exc
 from config.mysql_config import MYSQL_USERNAME, MYSQL_PASSWORD, MYSQL_DB_NAME, MYSQL_HOST, MYSQL_PORT
+from services import result_cache
+from services.connection_settings import load_settings
 
 db_url = f"mysql+mysqlconnector://{MYSQL_USERNAME}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB_NAME}"
 
-mysql_engine = create_engine(db_url)
+mysql_settings = load_settings('mysql')
 
+mysql_engine = create_engine(db_url,
+                             pool_size=mysql_settings['pool_size'],
+                             max_overflow=mysql_settings['max_overflow'],
+                             pool_timeout=mysql_settings['pool_timeout'],
+                             pool_recycle=mysql_settings['pool_recycle'],
+                             pool_pre_ping=mysql_settings['pool_pre_ping'])
 
-def get_top_keywords_by_university(university_name) -> pd.DataFrame:
-    query = """
-            SELECT k.name AS keyword, SUM(fk.score) AS total_score
-            FROM keyword k
-            JOIN faculty_keyword fk ON k.id = fk.keyword_id
-            JOIN faculty f ON fk.faculty_id = f.id
-            JOIN university u ON f.university_id = u.id
-            WHERE u.name = :university_name
-            GROUP BY k.name
-            ORDER BY total_score DESC
-            LIMIT 10
-        """
-    with mysql_engine.connect() as conn:
-        data = pd.read_sql_query(text(query), conn, params={"university_name": university_name})
-    return data
 
+# Cap SELECT run time on every pooled connection
+@event.listens_for(mysql_engine, "connect")
+def set_query_timeout(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"SET SESSION max_execution_time = {int(mysql_settings['query_timeout_ms'])}")
+    cursor.close()
 
-def update_university_rank(university_id, rank, connection):
+
+def table_exists(connection, table_name):
+    """Whether ``table_name`` exists in the current database."""
+    return bool(connection.execute(
+        text("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = :name"),
+        {"name": table_name}).scalar())
+
+
+class MissingTableError(exc.SQLAlchemyError):
+    """A table created by `python manage.py init` does not exist yet."""
+
+
+@contextmanager
+def require_table(table_name):
+    """Turn MySQL's "table doesn't exist" error for ``table_name`` into a MissingTableError that says what to run."""
     try:
-        query = f"UPDATE university SET university_rank = {rank} WHERE id = {university_id}"
-        connection.execute(text(query))
-    except exc.SQLAlchemyError:
+        yield
+    except exc.ProgrammingError as e:
+        if getattr(e.orig, 'errno', None) == 1146 and table_name in str(e.orig):
+            raise MissingTableError(f"The MySQL table {table_name} does not exist yet; "
+                                    f"run `python manage.py init`.") from e
         raise
+
+
+# Logo, top keywords by summed faculty score, and the number of distinct keywords of one university,
+# all from a single statement over the university_keyword_score rollup (see keyword_score_service):
+# the CTE reads the university's rollup rows through its index, keywords are ranked by name as the
+# original top-10 query grouped them, and the keyword count is over distinct keyword ids as the
+# original COUNT(DISTINCT k.id) was.
+UNIVERSITY_KEYWORDS_QUERY = """
+    WITH scores AS (
+        SELECT s.keyword_id, k.name AS keyword, s.total_score
+        FROM university u
+        JOIN university_keyword_score s ON s.university_id = u.id
+        JOIN keyword k ON k.id = s.keyword_id
+        WHERE u.name = :university_name
+    ), ranked AS (
+        SELECT keyword, SUM(total_score) AS total_score,
+               ROW_NUMBER() OVER (ORDER BY SUM(total_score) DESC, keyword) AS position
+        FROM scores
+        GROUP BY keyword
+    )
+    SELECT u.photo_url, r.keyword, r.total_score,
+           (SELECT COUNT(DISTINCT keyword_id) FROM scores) AS unique_keywords_count
+    FROM university u
+    LEFT JOIN ranked r ON r.position <= :limit
+    WHERE u.name = :university_name
+    ORDER BY r.position
+"""
+
+
+@result_cache.cached('university_keywords', depends_on=('faculty_keywords',))
+def get_university_keywords(university_name, limit=10):
+    """Logo URL, top ``limit`` keywords and distinct keyword count of a university in one round trip.
+
+    Returns ``{'logo_url': str, 'keywords': DataFrame(keyword, total_score), 'unique_keywords_count': int}``.
+    Cached per university. Nothing in the app writes faculty_keyword; the rollup, and with it this
+    cache (through the shared 'faculty_keywords' data version), is refreshed by
+    `python manage.py refresh-keyword-scores`.
+    """
+    with mysql_engine.connect() as conn, require_table('university_keyword_score'):
+        rows = conn.execute(text(UNIVERSITY_KEYWORDS_QUERY),
+                            {"university_name": university_name, "limit": limit}).fetchall()
+    keywords = pd.DataFrame([(row.keyword, row.total_score) for row in rows if row.keyword is not None],
+                            columns=['keyword', 'total_score'])
+    return {
+        'logo_url': rows[0].photo_url if rows else None,
+        'keywords': keywords,
+        'unique_keywords_count': rows[0].unique_keywords_count or 0 if rows else 0,
+    }
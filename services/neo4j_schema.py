@@ -0,0 +1,84 @@
+from services import collaboration_network, neo4j_service
+from services.neo4j_service import neo4j_session, STATS_LABEL
+
+# Indexes and constraints the dashboard's queries rely on. Every statement is idempotent
+# (IF NOT EXISTS), so ensure_schema() can run on every deploy via `python manage.py init`.
+SCHEMA_STATEMENTS = [
+    "CREATE INDEX publication_year IF NOT EXISTS FOR (pub:PUBLICATION) ON (pub.year)",
+    "CREATE INDEX institute_name IF NOT EXISTS FOR (u:INSTITUTE) ON (u.name)",
+    "CREATE INDEX faculty_name IF NOT EXISTS FOR (f:FACULTY) ON (f.name)",
+    f"CREATE INDEX institute_year_stats_year IF NOT EXISTS FOR (s:{STATS_LABEL}) ON (s.year)",
+    f"CREATE CONSTRAINT institute_year_stats_key IF NOT EXISTS "
+    f"FOR (s:{STATS_LABEL}) REQUIRE (s.year, s.institute) IS UNIQUE",
+]
+
+# Plan operators that mean a query reads every node (of a label) instead of seeking an index
+FULL_SCAN_OPERATORS = {'AllNodesScan', 'NodeByLabelScan'}
+
+# Queries checked by check_query_plans(): name -> (query, sample parameters, is_hot_path).
+# Hot-path queries run on user requests and must not plan a full scan; the others (bulk refresh,
+# warm-up) are planned too, so syntax errors surface, but full scans are expected there.
+REGISTERED_QUERIES = {
+    'top_institutes': (neo4j_service.TOP_INSTITUTES_QUERY, {'year': 2020, 'limit': 10}, True),
+    'live_top_institutes': (neo4j_service.LIVE_TOP_INSTITUTES_QUERY, {'year': 2020, 'limit': 10}, True),
+    'top_institutes_by_years': (neo4j_service.TOP_INSTITUTES_BY_YEARS_QUERY,
+                                {'years': [2019, 2020], 'limit': 10}, True),
+    'live_top_institutes_by_years': (neo4j_service.LIVE_TOP_INSTITUTES_BY_YEARS_QUERY,
+                                     {'years': [2019, 2020], 'limit': 10}, True),
+    'summarised_years': (neo4j_service.SUMMARISED_YEARS_QUERY, {'years': [2019, 2020]}, True),
+    'year_options': (neo4j_service.YEAR_OPTIONS_QUERY, {}, False),
+    'compute_stats': (neo4j_service.COMPUTE_STATS_QUERY, {'years': [2020], 'institutes': None}, False),
+    'network_start': (collaboration_network.START_QUERY, {'faculty': '', 'institute': ''}, True),
+    'network_hop': (collaboration_network.HOP_QUERY, {'frontier': [], 'per_faculty': 25}, True),
+}
+
+
+class QueryPlanError(Exception):
+    pass
+
+
+def register_query(name, query, params=None, hot=True):
+    """Add a query to the plan check, e.g. from a component that runs its own Cypher."""
+    REGISTERED_QUERIES[name] = (query, params or {}, hot)
+
+
+def ensure_schema():
+    """Create the indexes and constraints in SCHEMA_STATEMENTS; existing ones are left untouched."""
+    with neo4j_session() as session:
+        for statement in SCHEMA_STATEMENTS:
+            session.run(statement).consume()
+        # Wait for newly created indexes to come online before queries rely on them
+        session.run("CALL db.awaitIndexes(300)").consume()
+
+
+def _plan_operators(plan):
+    # Operator names carry a runtime suffix in Neo4j 5, e.g. "NodeByLabelScan@neo4j"
+    yield plan['operatorType'].split('@')[0]
+    for child in plan.get('children', []):
+        yield from _plan_operators(child)
+
+
+def explain(query, params=None):
+    """Return the set of operators in the planner's (EXPLAIN) plan for ``query``; nothing is executed."""
+    with neo4j_session() as session:
+        summary = session.run(f"EXPLAIN {query}", params or {}).consume()
+    return set(_plan_operators(summary.plan))
+
+
+def check_query_plans():
+    """EXPLAIN every registered query and raise QueryPlanError if a hot-path query plans a full scan.
+
+    Returns ``{name: operators}`` for all registered queries when the check passes.
+    """
+    plans = {}
+    violations = []
+    for name, (query, params, hot) in REGISTERED_QUERIES.items():
+        operators = explain(query, params)
+        plans[name] = operators
+        full_scans = operators & FULL_SCAN_OPERATORS
+        if hot and full_scans:
+            violations.append(f"{name}: {', '.join(sorted(full_scans))}")
+
+    if violations:
+        raise QueryPlanError("Hot-path Neo4j queries plan full scans (missing index?):\n  " + "\n  ".join(violations))
+    return plans
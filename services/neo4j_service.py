@@ -1,7 +1,149 @@
-from neo4j import GraphDatabase, basic_auth
+from contextlib import contextmanager
+from neo4j import GraphDatabase, Query, basic_auth
 from config.neo4j_config import NEO4J_USERNAME, NEO4J_PASSWORD, NEO4J_DB_NAME, NEO4J_HOST, NEO4J_PORT
+from services.connection_settings import load_settings, neo4j_session_counter
+
+neo4j_settings = load_settings('neo4j')
 
 # Create a Neo4j driver instance
 neo4j_driver = GraphDatabase.driver(f"bolt://{NEO4J_HOST}:{NEO4J_PORT}",
                                     auth=basic_auth(NEO4J_USERNAME, NEO4J_PASSWORD),
-                                    database=NEO4J_DB_NAME)
+                                    database=NEO4J_DB_NAME,
+                                    max_connection_pool_size=neo4j_settings['max_connection_pool_size'],
+                                    connection_acquisition_timeout=neo4j_settings['connection_acquisition_timeout'],
+                                    max_connection_lifetime=neo4j_settings['max_connection_lifetime'],
+                                    connection_timeout=neo4j_settings['connection_timeout'],
+                                    fetch_size=neo4j_settings['fetch_size'])
+
+
+@contextmanager
+def neo4j_session(**kwargs):
+    """Driver session that is counted in the pool metrics (see connection_settings.get_pool_metrics)."""
+    with neo4j_session_counter, neo4j_driver.session(**kwargs) as session:
+        yield session
+
+
+def timed(query):
+    """Wrap a read query with the configured per-query timeout."""
+    return Query(query, timeout=neo4j_settings['query_timeout'])
+
+YEAR_OPTIONS_QUERY = """
+    MATCH (pub:PUBLICATION) WHERE pub.year IS NOT NULL
+    RETURN DISTINCT pub.year AS year ORDER BY year DESC
+"""
+
+# Precomputed per-(year, institute) faculty and publication counts, stored as summary nodes so the
+# Yearly Rankings chart reads the top institutes of a year without traversing the publication graph
+STATS_LABEL = 'INSTITUTE_YEAR_STATS'
+
+# Years refreshed per write transaction during a full rebuild
+REFRESH_YEARS_PER_TRANSACTION = 5
+
+COMPUTE_STATS_QUERY = f"""
+    UNWIND $years AS year
+    MATCH (u:INSTITUTE)<-[:AFFILIATION_WITH]-(f:FACULTY)-[:PUBLISH]->(pub:PUBLICATION)
+    WHERE pub.year = year AND ($institutes IS NULL OR u.name IN $institutes)
+    WITH year, u.name AS institute, COUNT(DISTINCT f) AS faculty_count, COUNT(DISTINCT pub) AS publication_count
+    MERGE (s:{STATS_LABEL} {{year: year, institute: institute}})
+    SET s.faculty_count = faculty_count, s.publication_count = publication_count
+"""
+
+DELETE_STATS_QUERY = f"""
+    MATCH (s:{STATS_LABEL})
+    WHERE s.year IN $years AND ($institutes IS NULL OR s.institute IN $institutes)
+    DETACH DELETE s
+"""
+
+TOP_INSTITUTES_QUERY = f"""
+    MATCH (s:{STATS_LABEL} {{year: $year}})
+    RETURN s.institute AS university, s.faculty_count AS faculty_count, s.publication_count AS publication_count
+    ORDER BY publication_count DESC, faculty_count DESC
+    LIMIT $limit
+"""
+
+LIVE_TOP_INSTITUTES_QUERY = """
+    MATCH (u:INSTITUTE)<-[:AFFILIATION_WITH]-(f:FACULTY)-[:PUBLISH]->(pub:PUBLICATION)
+    WHERE pub.year = $year
+    RETURN u.name AS university, COUNT(DISTINCT f) AS faculty_count, COUNT(DISTINCT pub) AS publication_count
+    ORDER BY publication_count DESC, faculty_count DESC
+    LIMIT $limit
+"""
+
+
+def _refresh_stats(tx, years, institutes):
+    tx.run(DELETE_STATS_QUERY, years=years, institutes=institutes)
+    tx.run(COMPUTE_STATS_QUERY, years=years, institutes=institutes)
+
+
+def refresh_institute_year_stats(years=None, institutes=None):
+    """Recompute the summary nodes for ``years`` (all years if None), optionally only for ``institutes``.
+
+    Run from `python manage.py refresh-yearly-rankings` after the publication graph has been
+    reloaded. Returns the number of years refreshed.
+    """
+    with neo4j_session() as session:
+        if years is None:
+            result = session.run(YEAR_OPTIONS_QUERY)
+            years = [record['year'] for record in result]
+        years = [int(year) for year in years]
+
+        for i in range(0, len(years), REFRESH_YEARS_PER_TRANSACTION):
+            session.execute_write(_refresh_stats, years[i:i + REFRESH_YEARS_PER_TRANSACTION], institutes)
+
+    return len(years)
+
+
+def get_top_institutes(year, limit=10):
+    """Top institutes of ``year`` by publication then faculty count, from the precomputed summary nodes.
+
+    Falls back to the live graph traversal when the summary has not been built for that year.
+    """
+    with neo4j_session() as session:
+        records = [r.data() for r in session.run(timed(TOP_INSTITUTES_QUERY), year=int(year), limit=limit)]
+        if not records:
+            records = [r.data() for r in session.run(timed(LIVE_TOP_INSTITUTES_QUERY), year=int(year), limit=limit)]
+    return records
+
+
+TOP_INSTITUTES_BY_YEARS_QUERY = f"""
+    UNWIND $years AS year
+    MATCH (s:{STATS_LABEL} {{year: year}})
+    WITH s.institute AS university, SUM(s.publication_count) AS total_publications, COLLECT(s) AS per_year
+    ORDER BY total_publications DESC
+    LIMIT $limit
+    UNWIND per_year AS s
+    RETURN s.year AS year, university, s.faculty_count AS faculty_count, s.publication_count AS publication_count
+"""
+
+LIVE_TOP_INSTITUTES_BY_YEARS_QUERY = """
+    UNWIND $years AS year
+    MATCH (u:INSTITUTE)<-[:AFFILIATION_WITH]-(f:FACULTY)-[:PUBLISH]->(pub:PUBLICATION)
+    WHERE pub.year = year
+    WITH year, u.name AS university, COUNT(DISTINCT f) AS faculty_count, COUNT(DISTINCT pub) AS publication_count
+    WITH university, SUM(publication_count) AS total_publications,
+         COLLECT({year: year, faculty_count: faculty_count, publication_count: publication_count}) AS per_year
+    ORDER BY total_publications DESC
+    LIMIT $limit
+    UNWIND per_year AS row
+    RETURN row.year AS year, university, row.faculty_count AS faculty_count, row.publication_count AS publication_count
+"""
+
+SUMMARISED_YEARS_QUERY = f"""
+    UNWIND $years AS year
+    MATCH (s:{STATS_LABEL} {{year: year}})
+    RETURN DISTINCT year
+"""
+
+
+def get_top_institutes_by_years(years, limit=10):
+    """Per-year counts for the ``limit`` institutes with the most publications across all ``years``.
+
+    All years are computed by one grouped query (UNWIND $years) whose records are consumed as the
+    driver streams them. Uses the precomputed summary nodes when every year has been summarised and
+    the live graph traversal otherwise, so ``years`` should only hold years that have publications.
+    """
+    years = sorted({int(year) for year in years})
+    with neo4j_session() as session:
+        summarised = {record['year'] for record in session.run(timed(SUMMARISED_YEARS_QUERY), years=years)}
+        query = TOP_INSTITUTES_BY_YEARS_QUERY if summarised == set(years) else LIVE_TOP_INSTITUTES_BY_YEARS_QUERY
+        return [record.data() for record in session.run(timed(query), years=years, limit=limit)]
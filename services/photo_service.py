@@ -0,0 +1,85 @@
+import threading
+import time
+
+import requests
+
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+FALLBACK_PHOTO_URL = ('https://user-images.githubusercontent.com/8846884/'
+                      '232245136-e2a3e0f0-fd8c-4aa8-a18b-6e83848d9de3.jpeg')
+
+REQUEST_TIMEOUT_SECONDS = 5
+
+# How long a validation result is trusted before the URL is checked again
+VALID_TTL_SECONDS = 24 * 3600
+INVALID_TTL_SECONDS = 3600
+ERROR_TTL_SECONDS = 300
+
+MAX_WORKERS = 4
+
+_session = requests.Session()
+_session.mount('http://', HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS))
+_session.mount('https://', HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='photo-check')
+_lock = threading.Lock()
+_statuses = {}
+_pending = set()
+
+
+def check_image_url(image_url, session=None):
+    """Blocking check that ``image_url`` answers a HEAD request with an image.
+
+    Returns ``(is_valid, ttl_seconds)``; network errors are cached for a shorter time than a
+    definite answer from the host.
+    """
+    try:
+        response = (session or _session).head(image_url, timeout=REQUEST_TIMEOUT_SECONDS, allow_redirects=True)
+    except requests.exceptions.RequestException:
+        return False, ERROR_TTL_SECONDS
+    is_valid = response.status_code == 200 and 'image' in response.headers.get('Content-Type', '')
+    return is_valid, VALID_TTL_SECONDS if is_valid else INVALID_TTL_SECONDS
+
+
+def _validate(image_url):
+    try:
+        is_valid, ttl = check_image_url(image_url)
+        with _lock:
+            _statuses[image_url] = (is_valid, time.monotonic() + ttl)
+    finally:
+        with _lock:
+            _pending.discard(image_url)
+
+
+def get_status(image_url):
+    """Cached validity of ``image_url``: True, False, or None when unknown or expired."""
+    with _lock:
+        entry = _statuses.get(image_url)
+    if entry is None or entry[1] <= time.monotonic():
+        return None
+    return entry[0]
+
+
+def schedule_validation(image_url):
+    """Queue a background check of ``image_url`` unless one is already running."""
+    with _lock:
+        if image_url in _pending:
+            return
+        _pending.add(image_url)
+    _executor.submit(_validate, image_url)
+
+
+def get_photo_url(image_url):
+    """Return ``image_url`` if it is known to be a valid image, otherwise the fallback image.
+
+    Never blocks on the network: unknown URLs are validated in the background and the fallback is
+    shown until the result is cached.
+    """
+    if not image_url:
+        return FALLBACK_PHOTO_URL
+    status = get_status(image_url)
+    if status is None:
+        schedule_validation(image_url)
+        return FALLBACK_PHOTO_URL
+    return image_url if status else FALLBACK_PHOTO_URL
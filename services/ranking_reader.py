@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from openpyxl import load_workbook
+
+SUPPORTED_EXTENSIONS = ('.xlsx', '.csv')
+
+# Rows before the column header row in the QS ranking files
+HEADER_ROW = 4
+
+# Column positions (0-based) of institution, cpf rank, cpf score and country, keyed by the first header cell:
+# "rank display" for the 2023 file, "rank in country" for the 2022 file
+COLUMN_LAYOUTS = {
+    'rank display': (2, 17, 16, 4),  # C, R, Q, E
+    'rank in country': (4, 19, 18, 6),  # E, T, S, G
+}
+
+BATCH_SIZE = 200
+
+COUNTRY = 'United States'
+
+
+def is_supported_file(filename):
+    return filename.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def _is_zip(stream):
+    # Some QS "csv" exports are really xlsx workbooks, so sniff the content rather than trust the extension
+    position = stream.tell()
+    signature = stream.read(4)
+    stream.seek(position)
+    return signature == b'PK\x03\x04'
+
+
+def _layout(first_header_cell):
+    layout = COLUMN_LAYOUTS.get(str(first_header_cell).strip().lower())
+    if layout is None:
+        raise ValueError(f"Unrecognised ranking file layout (first header cell: {first_header_cell!r})")
+    return layout
+
+
+def _iter_xlsx_chunks(stream, batch_size):
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[0]
+        # max_row comes from the sheet's dimension record, so it is only an estimate for progress
+        total_rows = max((worksheet.max_row or 0) - HEADER_ROW, 1)
+        rows = worksheet.iter_rows(min_row=HEADER_ROW, values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        layout = _layout(header[0])
+
+        columns = ['institution', 'cpf rank', 'cpf score', 'country']
+        chunk = []
+        read = 0
+        for row in rows:
+            chunk.append([row[i] if i < len(row) else None for i in layout])
+            read += 1
+            if len(chunk) >= batch_size:
+                yield pd.DataFrame(chunk, columns=columns), min(read / total_rows, 1.0)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=columns), 1.0
+    finally:
+        workbook.close()
+
+
+def _iter_csv_chunks(stream, batch_size):
+    header = pd.read_csv(stream, skiprows=HEADER_ROW - 1, header=None, nrows=1)
+    layout = _layout(header.iloc[0, 0])
+    stream.seek(0, 2)
+    total_bytes = max(stream.tell(), 1)
+    stream.seek(0)
+
+    # usecols returns columns in file order, so select them back into layout order
+    for chunk in pd.read_csv(stream, skiprows=HEADER_ROW, header=None, usecols=list(layout), chunksize=batch_size):
+        chunk = chunk[list(layout)]
+        chunk.columns = ['institution', 'cpf rank', 'cpf score', 'country']
+        yield chunk, min(stream.tell() / total_bytes, 1.0)
+
+
+def iter_ranking_batches(stream, filename, batch_size=BATCH_SIZE, report_progress=None):
+    """Stream a QS ranking file as filtered batches of US institutions.
+
+    Only the institution, cpf rank, cpf score and country columns are read, and rows are filtered as
+    they stream, so memory stays bounded by ``batch_size`` rather than the file size. Each batch is a
+    dataframe with ``University Name``, ``Citations per Faculty Rank`` and ``Score`` columns.
+
+    Ranks of 601 and above are replaced by the average cpf score of all such rows in the file, which is
+    only known once the whole file has been read; those rows are held back and yielded last.
+
+    ``report_progress``, if given, is called with the estimated fraction of the file read so far.
+    """
+    if filename.lower().endswith('.xlsx') or _is_zip(stream):
+        chunks = _iter_xlsx_chunks(stream, batch_size)
+    else:
+        chunks = _iter_csv_chunks(stream, batch_size)
+
+    tail_sum, tail_count = 0.0, 0
+    held_back = []
+
+    for chunk, fraction_read in chunks:
+        if report_progress is not None:
+            report_progress(fraction_read)
+        chunk['cpf rank'] = chunk['cpf rank'].replace('+', 1000)
+        chunk['Citations per Faculty Rank'] = pd.to_numeric(chunk['cpf rank'], errors='coerce')
+        chunk['cpf score'] = pd.to_numeric(chunk['cpf score'], errors='coerce')
+
+        tail = chunk['Citations per Faculty Rank'] >= 601
+        tail_sum += chunk.loc[tail, 'cpf score'].sum()
+        tail_count += int(chunk.loc[tail, 'cpf score'].count())
+
+        chunk = chunk.dropna()
+        chunk = chunk.loc[chunk['country'].astype(str).str.strip() == COUNTRY]
+        chunk = chunk[['institution', 'Citations per Faculty Rank', 'cpf score']].rename(
+            columns={'institution': 'University Name', 'cpf score': 'Score'})
+        chunk['University Name'] = chunk['University Name'].astype(str).str.strip()
+
+        is_tail = chunk['Citations per Faculty Rank'] >= 601
+        if is_tail.any():
+            held_back.append(chunk.loc[is_tail])
+        if (~is_tail).any():
+            yield chunk.loc[~is_tail]
+
+    if held_back:
+        tail_rows = pd.concat(held_back)
+        tail_rows['Citations per Faculty Rank'] = tail_sum / tail_count if tail_count else np.nan
+        yield tail_rows.dropna()
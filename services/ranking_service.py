@@ -0,0 +1,256 @@
+import numpy as np
+import pandas as pd
+
+from rapidfuzz import fuzz, process, utils
+from services.mysql_service import mysql_engine, require_table, table_exists
+from sqlalchemy import bindparam, text, exc
+
+MIN_MATCH_SCORE = 88
+
+# A CSV name is reported as ambiguous when a second university scores within this many points of the
+# best match; the best match is still applied, as process.extractOne would
+AMBIGUITY_MARGIN = 1.0
+
+# Resolved QS name -> university mappings are persisted here so later uploads skip fuzzy scoring.
+# method is 'manual' (curated override), 'fuzzy' (best WRatio match) or 'ambiguous' (best WRatio match
+# with a close runner-up, worth reviewing with `manage.py set-alias`).
+ALIAS_TABLE = 'university_alias'
+
+CREATE_ALIAS_TABLE = f'''
+CREATE TABLE IF NOT EXISTS {ALIAS_TABLE} (
+  source_name VARCHAR(255) PRIMARY KEY,
+  university_id INT NULL,
+  score FLOAT NOT NULL,
+  method VARCHAR(16) NOT NULL,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+)
+'''
+
+# Manual aliases for ranking-file names that fuzzy matching gets wrong: (ranking file name, university name)
+SEED_ALIASES = [
+    ('Virginia Polytechnic Institute and State University', 'Virginia Tech'),
+    ('Stony Brook University, State University of New York', 'Stony Brook University--SUNY'),
+    ('Brigham Young University', 'Brigham Young University--Provo'),
+    ('University of Denver', 'University of Denver'),
+    ('University of Florida', 'University of Florida'),
+    ('Purdue University', 'Purdue University--West Lafayette'),
+    ('University of San Diego', 'University of San Diego'),
+]
+
+
+def score_matrix(queries, choices):
+    """WRatio scores for every (query, choice) pair, computed in one batched rapidfuzz call.
+
+    rapidfuzz returns float scores; they are rounded to whole numbers as fuzzywuzzy's WRatio was, so
+    MIN_MATCH_SCORE accepts the same names as before (e.g. 87.5 rounds to 88 and matches).
+    """
+    if len(queries) == 0 or len(choices) == 0:
+        return np.zeros((len(queries), len(choices)), dtype=np.float32)
+    return np.round(process.cdist(queries, choices, scorer=fuzz.WRatio, processor=utils.default_process,
+                                  workers=-1))
+
+
+def ensure_alias_table():
+    """Create the alias table with the seed manual aliases if it does not exist yet; returns True if created."""
+    with mysql_engine.begin() as connection:
+        if table_exists(connection, ALIAS_TABLE):
+            return False
+        connection.execute(text(CREATE_ALIAS_TABLE))
+        connection.execute(
+            text(f"INSERT IGNORE INTO {ALIAS_TABLE} (source_name, university_id, score, method) "
+                 "SELECT :source_name, id, 100, 'manual' FROM university WHERE name = :name"),
+            [{'source_name': source_name, 'name': name} for source_name, name in SEED_ALIASES])
+    return True
+
+
+def load_aliases(names, connection):
+    """Return ``{source_name: (university_id, score, method)}`` for the names already in the alias table."""
+    if not names:
+        return {}
+    with require_table(ALIAS_TABLE):
+        result = connection.execute(
+            text(f"SELECT source_name, university_id, score, method FROM {ALIAS_TABLE} "
+                 "WHERE source_name IN :names").bindparams(bindparam('names', expanding=True)),
+            {'names': list(names)})
+    return {row[0]: (row[1], row[2], row[3]) for row in result}
+
+
+def save_aliases(aliases, connection):
+    """Persist newly scored ``{source_name: (university_id, score, method)}`` rows, keeping existing entries."""
+    if not aliases:
+        return
+    connection.execute(
+        text(f"INSERT IGNORE INTO {ALIAS_TABLE} (source_name, university_id, score, method) "
+             "VALUES (:source_name, :university_id, :score, :method)"),
+        [{'source_name': name, 'university_id': None if uid is None else int(uid), 'score': float(score),
+          'method': method} for name, (uid, score, method) in aliases.items()])
+
+
+def set_manual_alias(source_name, university_name):
+    """Map a ranking-file institution name to a university by name, overriding any fuzzy match."""
+    with mysql_engine.connect() as connection:
+        trans = connection.begin()
+        try:
+            university_id = connection.execute(text("SELECT id FROM university WHERE name = :name"),
+                                               {'name': university_name}).scalar()
+            if university_id is None:
+                raise ValueError(f"Unknown university: {university_name}")
+            connection.execute(
+                text(f"REPLACE INTO {ALIAS_TABLE} (source_name, university_id, score, method) "
+                     "VALUES (:source_name, :university_id, 100, 'manual')"),
+                {'source_name': source_name, 'university_id': university_id})
+            trans.commit()
+        except exc.SQLAlchemyError:
+            trans.rollback()
+            raise
+
+
+def clear_fuzzy_aliases():
+    """Forget every non-manual alias so the next upload re-scores those names (e.g. after adding universities)."""
+    with mysql_engine.connect() as connection:
+        trans = connection.begin()
+        try:
+            deleted = connection.execute(text(f"DELETE FROM {ALIAS_TABLE} WHERE method <> 'manual'")).rowcount
+            trans.commit()
+        except exc.SQLAlchemyError:
+            trans.rollback()
+            raise
+    return deleted
+
+
+def score_unseen_names(names, sql_universities):
+    """Fuzzy-match names that have no alias yet, returning new ``{source_name: (university_id, score, method)}`` rows."""
+    sql_names = list(sql_universities.keys())
+    scores = score_matrix(names, sql_names)
+    if len(names) == 0 or len(sql_names) == 0:
+        return {name: (None, 0.0, 'fuzzy') for name in names}
+
+    best = scores.argmax(axis=1)
+    best_scores = scores[np.arange(len(names)), best]
+    if len(sql_names) > 1:
+        runner_up_scores = np.partition(scores, -2, axis=1)[:, -2]
+    else:
+        runner_up_scores = np.full(len(names), -np.inf)
+
+    aliases = {}
+    for i, name in enumerate(names):
+        university_id = sql_universities[sql_names[best[i]]]
+        method = 'ambiguous' if best_scores[i] - runner_up_scores[i] < AMBIGUITY_MARGIN else 'fuzzy'
+        aliases[name] = (university_id, best_scores[i], method)
+    return aliases
+
+
+def match_rankings(csv_rankings, sql_universities, aliases, min_match_score=MIN_MATCH_SCORE):
+    """Map CSV rankings onto SQL university ids.
+
+    ``csv_rankings`` maps CSV institution names to ranks, ``sql_universities`` maps SQL university
+    names to ids and ``aliases`` holds the stored alias rows for those CSV names. Only names without an
+    alias are fuzzy-scored. Returns ``(ranks, stats, new_aliases)`` where ``ranks`` maps university id
+    to ``(rank, is_manual)`` and ``stats`` counts matched, unmatched and newly scored names; ``ambiguous``
+    counts the matched names whose best match had a close runner-up.
+    """
+    unseen = [name for name in csv_rankings if name not in aliases]
+    new_aliases = score_unseen_names(unseen, sql_universities)
+    resolved = {**aliases, **new_aliases}
+    university_ids = set(sql_universities.values())
+
+    ranks = {}
+    manual_ranks = {}
+    stats = {'matched': 0, 'unmatched': 0, 'ambiguous': 0, 'scored': len(unseen)}
+
+    for csv_name, rank in csv_rankings.items():
+        university_id, score, method = resolved[csv_name]
+        if method == 'manual' and university_id in university_ids:
+            stats['matched'] += 1
+            manual_ranks[university_id] = (rank, True)
+        # Aliases stored before scores were rounded may still hold fractional scores
+        elif round(float(score)) < min_match_score or university_id not in university_ids:
+            stats['unmatched'] += 1
+        else:
+            stats['matched'] += 1
+            if method == 'ambiguous':
+                stats['ambiguous'] += 1
+            ranks[university_id] = (rank, False)
+
+    # Curated aliases win over fuzzy matches for the same university
+    ranks.update(manual_ranks)
+    return ranks, stats, new_aliases
+
+
+def create_rank_stage(connection):
+    connection.execute(text(
+        "CREATE TEMPORARY TABLE IF NOT EXISTS university_rank_stage "
+        "(university_id INT PRIMARY KEY, university_rank INT, is_manual BOOLEAN)"))
+    connection.execute(text("DELETE FROM university_rank_stage"))
+
+
+def stage_ranks(ranks, connection):
+    """Load ``{university_id: (rank, is_manual)}`` into the staging table with one executemany.
+
+    A university staged by an earlier batch keeps its rank only if that rank came from a manual alias
+    and the new one did not.
+    """
+    if not ranks:
+        return
+    connection.execute(
+        text("INSERT INTO university_rank_stage (university_id, university_rank, is_manual) "
+             "VALUES (:uid, :rank, :is_manual) "
+             "ON DUPLICATE KEY UPDATE "
+             "university_rank = IF(is_manual AND NOT VALUES(is_manual), university_rank, VALUES(university_rank)), "
+             "is_manual = is_manual OR VALUES(is_manual)"),
+        [{'uid': int(uid), 'rank': int(round(rank)), 'is_manual': is_manual}
+         for uid, (rank, is_manual) in ranks.items()])
+
+
+def apply_rank_stage(connection):
+    """Apply every staged rank with a single UPDATE ... JOIN and drop the staging table."""
+    try:
+        connection.execute(text(
+            "UPDATE university u JOIN university_rank_stage s ON s.university_id = u.id "
+            "SET u.university_rank = s.university_rank"))
+    finally:
+        connection.execute(text("DROP TEMPORARY TABLE IF EXISTS university_rank_stage"))
+
+
+def update_university_rankings(batches, min_match_score=MIN_MATCH_SCORE, report=None):
+    """Match streamed QS ranking batches against the university table and apply all ranks in one transaction.
+
+    ``batches`` is an iterable of dataframes with ``University Name`` and ``Citations per Faculty Rank``
+    columns (see ranking_reader.iter_ranking_batches). Each batch is matched and staged as soon as it is
+    read; the staged ranks are applied together at the end. Returns the match stats plus ``updated``,
+    the number of universities with a rank after the import.
+
+    ``report``, if given, is called with a status message after each batch.
+    """
+    stats = {'matched': 0, 'unmatched': 0, 'ambiguous': 0, 'scored': 0}
+
+    with mysql_engine.connect() as connection:
+        trans = connection.begin()
+        try:
+            result = connection.execute(text('SELECT id, name FROM university'))
+            df_university = pd.DataFrame(result.fetchall(), columns=["id", "name"])
+            sql_universities = dict(zip(df_university['name'], df_university['id']))
+
+            create_rank_stage(connection)
+            for batch in batches:
+                csv_rankings = dict(zip(batch['University Name'], batch['Citations per Faculty Rank']))
+                aliases = load_aliases(csv_rankings.keys(), connection)
+                ranks, batch_stats, new_aliases = match_rankings(csv_rankings, sql_universities, aliases,
+                                                                 min_match_score)
+                save_aliases(new_aliases, connection)
+                stage_ranks(ranks, connection)
+                for key, value in batch_stats.items():
+                    stats[key] += value
+                if report is not None:
+                    report(f"{stats['matched']} matched, {stats['unmatched']} unmatched, "
+                           f"{stats['ambiguous']} ambiguous so far")
+            apply_rank_stage(connection)
+            trans.commit()
+        except (exc.SQLAlchemyError, ValueError):
+            trans.rollback()
+            raise
+
+        stats['updated'] = connection.execute(
+            text("SELECT COUNT(*) FROM university WHERE university_rank IS NOT NULL")).scalar()
+
+    return stats
@@ -0,0 +1,67 @@
+import threading
+import time
+
+from services.mysql_service import mysql_engine
+from sqlalchemy import text
+
+# Reference data (university and faculty names) changes rarely, so dropdown option lists are built
+# once and shared by every callback in the process. Entries expire after CACHE_TTL_SECONDS and are
+# dropped immediately when invalidate() bumps the data version after a write.
+CACHE_TTL_SECONDS = 300
+
+_lock = threading.Lock()
+_entries = {}
+_version = 0
+
+
+def invalidate():
+    global _version
+    with _lock:
+        _version += 1
+        _entries.clear()
+
+
+def get_version():
+    return _version
+
+
+def _get_or_load(key, loader):
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[0] == _version and entry[1] > now:
+            return entry[2]
+        version = _version
+
+    value = loader()
+
+    with _lock:
+        # Only store the result if no write invalidated the cache while we were loading
+        if version == _version:
+            _entries[key] = (version, now + CACHE_TTL_SECONDS, value)
+    return value
+
+
+def _load_universities():
+    with mysql_engine.connect() as connection:
+        result = connection.execute(text('SELECT id, name FROM university ORDER BY name'))
+        return [(row[0], row[1]) for row in result]
+
+
+def _load_faculty():
+    with mysql_engine.connect() as connection:
+        result = connection.execute(text('SELECT id, name, university_id FROM faculty ORDER BY name'))
+        return [(row[0], row[1], row[2]) for row in result]
+
+
+def get_universities():
+    """All universities as ``(id, name)`` tuples ordered by name.
+
+    The same list object is returned until the entry expires or is invalidated.
+    """
+    return _get_or_load(('universities',), _load_universities)
+
+
+def get_faculty():
+    """All faculty as ``(id, name, university_id)`` tuples ordered by name."""
+    return _get_or_load(('faculty',), _load_faculty)
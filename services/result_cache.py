@@ -0,0 +1,224 @@
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from collections import OrderedDict
+from flask import jsonify
+from config.cache_config import (RESULT_CACHE_BACKEND, RESULT_CACHE_PATH, RESULT_CACHE_MAX_ENTRIES,
+                                 RESULT_CACHE_TTL_SECONDS)
+
+
+def connect_sqlite(local, path):
+    """Per-thread sqlite connection (kept on ``local``) to a WAL-mode database file shared by all processes."""
+    conn = getattr(local, 'conn', None)
+    if conn is None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        local.conn = conn
+    return conn
+
+
+class VersionStore:
+    """Data versions kept in a sqlite file, whichever backend holds the cached entries.
+
+    A bump made by any process on the host, including `python manage.py` commands, is seen by every
+    worker on its next lookup. Hosts that do not share the file do not see each other's bumps.
+    """
+
+    def __init__(self, path=RESULT_CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, version INTEGER)")
+
+    def _connect(self):
+        return connect_sqlite(self._local, self.path)
+
+    def get(self, name):
+        row = self._connect().execute("SELECT version FROM versions WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, name):
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT INTO versions (name, version) VALUES (?, 1) "
+                         "ON CONFLICT(name) DO UPDATE SET version = version + 1", (name,))
+
+
+class MemoryBackend:
+    """Per-process LRU cache with per-entry TTL; data versions are shared through a VersionStore."""
+
+    def __init__(self, max_entries=RESULT_CACHE_MAX_ENTRIES, versions=None):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._versions = versions or VersionStore()
+        self._stats = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_version(self, name):
+        return self._versions.get(name)
+
+    def bump_version(self, name):
+        self._versions.bump(name)
+
+    def record(self, namespace, hit):
+        with self._lock:
+            counters = self._stats.setdefault(namespace, {'hits': 0, 'misses': 0})
+            counters['hits' if hit else 'misses'] += 1
+
+    def stats(self):
+        with self._lock:
+            return {namespace: dict(counters) for namespace, counters in self._stats.items()}
+
+
+class SqliteBackend:
+    """LRU cache with per-entry TTL stored in a sqlite file, shared by every worker process on the host.
+
+    Hit/miss counters live in the same file as the entries and the data versions.
+    """
+
+    def __init__(self, path=RESULT_CACHE_PATH, max_entries=RESULT_CACHE_MAX_ENTRIES, versions=None):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._versions = versions or VersionStore(path)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS entries "
+                         "(key TEXT PRIMARY KEY, value BLOB, expires_at REAL, accessed_at REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS stats "
+                         "(namespace TEXT PRIMARY KEY, hits INTEGER DEFAULT 0, misses INTEGER DEFAULT 0)")
+
+    def _connect(self):
+        return connect_sqlite(self._local, self.path)
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False, None
+        now = time.time()
+        with conn:
+            if row[1] <= now:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return False, None
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return True, pickle.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                         (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now + ttl, now))
+            conn.execute("DELETE FROM entries WHERE key IN "
+                         "(SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                         (self.max_entries,))
+
+    def clear(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries")
+
+    def get_version(self, name):
+        return self._versions.get(name)
+
+    def bump_version(self, name):
+        self._versions.bump(name)
+
+    def record(self, namespace, hit):
+        column = 'hits' if hit else 'misses'
+        conn = self._connect()
+        with conn:
+            conn.execute(f"INSERT INTO stats (namespace, {column}) VALUES (?, 1) "
+                         f"ON CONFLICT(namespace) DO UPDATE SET {column} = {column} + 1", (namespace,))
+
+    def stats(self):
+        rows = self._connect().execute("SELECT namespace, hits, misses FROM stats").fetchall()
+        return {namespace: {'hits': hits, 'misses': misses} for namespace, hits, misses in rows}
+
+
+def _create_backend():
+    versions = VersionStore()
+    if RESULT_CACHE_BACKEND == 'sqlite':
+        return SqliteBackend(versions=versions)
+    return MemoryBackend(versions=versions)
+
+
+backend = _create_backend()
+
+
+def bump_data_version(name):
+    """Invalidate every cached result that depends on the data source ``name``, in every process on the host."""
+    backend.bump_version(name)
+
+
+def get_stats():
+    """Hit/miss counters and hit ratio per cached function namespace."""
+    stats = backend.stats()
+    for counters in stats.values():
+        total = counters['hits'] + counters['misses']
+        counters['hit_ratio'] = counters['hits'] / total if total else 0.0
+    return stats
+
+
+def cached(namespace, depends_on=(), ttl=RESULT_CACHE_TTL_SECONDS):
+    """Cache a function's results in the configured backend.
+
+    The key is built from ``namespace``, the current data version of every source in ``depends_on``
+    and the call arguments, so bumping a source's version (see bump_data_version) makes stale
+    entries unreachable. Usable under ``@app.callback``::
+
+        @app.callback(...)
+        @result_cache.cached('yearly_rankings', depends_on=('publications',))
+        def update_chart(selected_year): ...
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            versions = tuple(backend.get_version(name) for name in depends_on)
+            key = hashlib.sha256(repr((namespace, versions, args, sorted(kwargs.items()))).encode()).hexdigest()
+            hit, value = backend.get(key)
+            backend.record(namespace, hit)
+            if hit:
+                return value
+            value = fn(*args, **kwargs)
+            backend.set(key, value, ttl)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def register_routes(server):
+    server.add_url_rule('/cache-stats', 'cache_stats', lambda: jsonify(get_stats()))
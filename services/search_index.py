@@ -0,0 +1,191 @@
+import bisect
+import heapq
+import threading
+
+from collections import defaultdict
+from services import reference_cache
+
+# Maximum number of options returned to a dropdown for one search_value
+SEARCH_RESULT_LIMIT = 50
+
+
+def _normalize(name):
+    return ' '.join(str(name).lower().split())
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:
+    """Prefix/trigram index over names, used for dropdown typeahead.
+
+    Queries of three or more characters intersect trigram posting sets and then check for a
+    substring match; shorter queries use a sorted token list to find word prefixes. Entries can
+    optionally belong to a group (e.g. faculty by university) so searches can be scoped.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._labels = {}
+        self._normalized = {}
+        self._groups = {}
+        self._group_members = defaultdict(set)
+        self._trigram_postings = defaultdict(set)
+        self._tokens = []
+
+    def __len__(self):
+        return len(self._labels)
+
+    def label(self, key):
+        return self._labels.get(key)
+
+    def group(self, key):
+        return self._groups.get(key)
+
+    def keys(self):
+        return set(self._labels)
+
+    def upsert(self, key, name, group=None):
+        with self._lock:
+            if key in self._labels:
+                if self._labels[key] == name and self._groups.get(key) == group:
+                    return
+                self.remove(key)
+
+            for token in self._add(key, name, group):
+                bisect.insort(self._tokens, (token, key))
+
+    def _add(self, key, name, group):
+        normalized = _normalize(name)
+        self._labels[key] = name
+        self._normalized[key] = normalized
+        self._groups[key] = group
+        self._group_members[group].add(key)
+        for trigram in _trigrams(normalized):
+            self._trigram_postings[trigram].add(key)
+        return set(normalized.split())
+
+    def remove(self, key):
+        with self._lock:
+            if key not in self._labels:
+                return
+            del self._labels[key]
+            normalized = self._normalized.pop(key)
+            group = self._groups.pop(key)
+            self._group_members[group].discard(key)
+            for trigram in _trigrams(normalized):
+                postings = self._trigram_postings[trigram]
+                postings.discard(key)
+                if not postings:
+                    del self._trigram_postings[trigram]
+            for token in set(normalized.split()):
+                i = bisect.bisect_left(self._tokens, (token, key))
+                if i < len(self._tokens) and self._tokens[i] == (token, key):
+                    del self._tokens[i]
+
+    def _candidates(self, query, group):
+        if not query:
+            return set(self._labels) if group is None else set(self._group_members[group])
+
+        if len(query) >= 3:
+            postings = sorted((self._trigram_postings.get(t, set()) for t in _trigrams(query)), key=len)
+            candidates = set.intersection(*postings) if postings else set()
+            candidates = {key for key in candidates if query in self._normalized[key]}
+        else:
+            candidates = set()
+            i = bisect.bisect_left(self._tokens, (query,))
+            while i < len(self._tokens) and self._tokens[i][0].startswith(query):
+                candidates.add(self._tokens[i][1])
+                i += 1
+
+        if group is not None:
+            candidates &= self._group_members[group]
+        return candidates
+
+    def search(self, query, limit=SEARCH_RESULT_LIMIT, group=None):
+        """Return up to ``limit`` keys matching ``query``: name prefixes first, then word prefixes, then substrings."""
+        query = _normalize(query or '')
+
+        def rank(key):
+            normalized = self._normalized[key]
+            if normalized.startswith(query):
+                return 0, normalized
+            if any(token.startswith(query) for token in normalized.split()):
+                return 1, normalized
+            return 2, normalized
+
+        with self._lock:
+            return heapq.nsmallest(limit, self._candidates(query, group), key=rank)
+
+    def sync(self, rows):
+        """Apply ``(key, name, group)`` rows as a diff: changed rows are re-indexed, missing ones removed."""
+        with self._lock:
+            if not self._labels:
+                # Initial build: collect the tokens and sort once instead of inserting one by one
+                for key, name, group in rows:
+                    self._tokens.extend((token, key) for token in self._add(key, name, group))
+                self._tokens.sort()
+                return
+
+            seen = set()
+            for key, name, group in rows:
+                seen.add(key)
+                self.upsert(key, name, group)
+            for key in self.keys() - seen:
+                self.remove(key)
+
+
+_university_index = NameIndex()
+_faculty_index = NameIndex()
+_sync_lock = threading.Lock()
+_synced_rows = {'universities': None, 'faculty': None}
+
+
+def ensure_synced():
+    # reference_cache hands back the same list object until it expires or is invalidated, so the
+    # indexes only re-diff their rows when the underlying reference data was actually reloaded
+    universities = reference_cache.get_universities()
+    faculty = reference_cache.get_faculty()
+    with _sync_lock:
+        if _synced_rows['universities'] is not universities:
+            _university_index.sync((uid, name, None) for uid, name in universities)
+            _synced_rows['universities'] = universities
+        if _synced_rows['faculty'] is not faculty:
+            _faculty_index.sync(faculty)
+            _synced_rows['faculty'] = faculty
+
+
+def search_university_options(search_value, value_field='id', selected=None, limit=SEARCH_RESULT_LIMIT):
+    """Dropdown options for the universities best matching ``search_value``.
+
+    The currently ``selected`` value (or list of values, for multi-select dropdowns) is always kept
+    in the options so Dash does not clear it.
+    """
+    ensure_synced()
+    keys = _university_index.search(search_value, limit)
+    if value_field == 'name':
+        options = [{'label': _university_index.label(uid), 'value': _university_index.label(uid)} for uid in keys]
+    else:
+        options = [{'label': _university_index.label(uid), 'value': uid} for uid in keys]
+
+    values = {option['value'] for option in options}
+    for value in reversed(selected if isinstance(selected, list) else [selected]):
+        if value is not None and value not in values:
+            label = value if value_field == 'name' else _university_index.label(value)
+            if label is not None:
+                options.insert(0, {'label': label, 'value': value})
+    return options
+
+
+def search_faculty_options(university_id, search_value, selected=None, limit=SEARCH_RESULT_LIMIT):
+    """Dropdown options for the faculty of ``university_id`` best matching ``search_value``."""
+    ensure_synced()
+    keys = _faculty_index.search(search_value, limit, group=university_id)
+    options = [{'label': _faculty_index.label(fid), 'value': fid} for fid in keys]
+
+    if selected is not None and all(option['value'] != selected for option in options):
+        label = _faculty_index.label(selected)
+        if label is not None and _faculty_index.group(selected) == university_id:
+            options.insert(0, {'label': label, 'value': selected})
+    return options
@@ -0,0 +1,175 @@
+import datetime
+import json
+import re
+
+import pandas as pd
+
+from sqlalchemy import text
+
+# Server-side paging, sorting and filtering for dash_table.DataTable with page_action, sort_action
+# and filter_action set to 'custom'. Only one page of rows is ever sent to the browser.
+#
+# SQL-backed tables page with keyset ("seek") predicates: the sort key of the last row of page N is
+# kept in a dcc.Store as the cursor of page N + 1, so the next page is an index range read that
+# starts after that row instead of an OFFSET scan over every earlier page. Jumps to a page without
+# a cursor (e.g. typing a page number) fall back to OFFSET once and then continue by keyset.
+
+# DataTable filter operators, longest first so '>=' is not read as '>'
+FILTER_OPERATORS = [('>=', 'ge'), ('<=', 'le'), ('!=', 'ne'), ('>', 'gt'), ('<', 'lt'), ('=', 'eq'),
+                    ('ge ', 'ge'), ('le ', 'le'), ('ne ', 'ne'), ('gt ', 'gt'), ('lt ', 'lt'), ('eq ', 'eq'),
+                    ('contains ', 'contains'), ('datestartswith ', 'datestartswith')]
+
+SQL_OPERATORS = {'ge': '>=', 'le': '<=', 'ne': '<>', 'gt': '>', 'lt': '<', 'eq': '='}
+
+_FILTER_PART = re.compile(r'^\{(?P<column>[^}]+)\}\s*(?P<rest>.*)$')
+
+
+def _parse_value(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'", '`'):
+        return value[1:-1].replace('\\' + value[0], value[0])
+    try:
+        return float(value) if '.' in value else int(value)
+    except ValueError:
+        return value
+
+
+def parse_filter(filter_query):
+    """Split a DataTable ``filter_query`` into ``[(column, operator, value)]``; unknown parts are ignored."""
+    filters = []
+    for part in (filter_query or '').split(' && '):
+        match = _FILTER_PART.match(part.strip())
+        if match is None:
+            continue
+        rest = match.group('rest')
+        for token, operator in FILTER_OPERATORS:
+            if rest.startswith(token):
+                filters.append((match.group('column'), operator, _parse_value(rest[len(token):])))
+                break
+    return filters
+
+
+def _like_pattern(value):
+    return str(value).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def filter_conditions(filters, columns):
+    """SQL conditions and bind parameters for parsed filters on ``columns`` ({column id: SQL expression})."""
+    conditions = []
+    params = {}
+    for i, (column, operator, value) in enumerate(filters):
+        if column not in columns:
+            continue
+        name = f"filter_{i}"
+        if operator == 'contains':
+            conditions.append(f"{columns[column]} LIKE :{name}")
+            params[name] = f"%{_like_pattern(value)}%"
+        elif operator == 'datestartswith':
+            conditions.append(f"{columns[column]} LIKE :{name}")
+            params[name] = f"{_like_pattern(value)}%"
+        else:
+            conditions.append(f"{columns[column]} {SQL_OPERATORS[operator]} :{name}")
+            params[name] = value
+    return conditions, params
+
+
+def _jsonable(value):
+    # Cursors and rows go through a dcc.Store / the DataTable, which only carry JSON
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime.datetime) else value.isoformat()
+    return value
+
+
+def fetch_page(connection, from_sql, columns, key_columns, base_conditions=(), default_sort=None,
+               sort_by=None, filter_query='', page_current=0, page_size=10, state=None, params=None):
+    """One page of a SQL query for a server-side DataTable.
+
+    ``from_sql`` is the ``FROM ... JOIN ...`` clause, ``columns`` maps each DataTable column id to
+    its SQL expression and ``key_columns`` are SQL expressions that make a row unique and break ties
+    in the sort. ``state`` is the JSON cursor state from the previous call (kept in a dcc.Store).
+    Returns ``(records, page_count, state)``.
+    """
+    sort = [s for s in (sort_by or ([default_sort] if default_sort else [])) if s['column_id'] in columns][:1]
+    signature = json.dumps([sort, filter_query or ''])
+    if not state or state.get('signature') != signature:
+        state = {'signature': signature, 'cursors': {}, 'total': None}
+
+    conditions, bind = filter_conditions(parse_filter(filter_query), columns)
+    conditions = list(base_conditions) + conditions
+    bind.update(params or {})
+
+    if state['total'] is None:
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        state['total'] = connection.execute(text(f"SELECT COUNT(*) {from_sql}{where}"), bind).scalar()
+
+    ascending = not sort or sort[0]['direction'] == 'asc'
+    direction = 'ASC' if ascending else 'DESC'
+    order = ([columns[sort[0]['column_id']]] if sort else []) + list(key_columns)
+
+    offset = page_current * page_size
+    cursor = state['cursors'].get(str(page_current))
+    if page_current > 0 and cursor is not None and (not sort or cursor[0] is not None):
+        placeholders = ', '.join(f":cursor_{i}" for i in range(len(order)))
+        seek = f"({', '.join(order)}) {'>' if ascending else '<'} ({placeholders})"
+        if sort and not ascending:
+            # MySQL sorts NULLs last in DESC order, and a row comparison with NULL is never true
+            seek = f"({seek} OR {order[0]} IS NULL)"
+        conditions.append(seek)
+        bind.update({f"cursor_{i}": value for i, value in enumerate(cursor)})
+        offset = 0
+
+    select = ', '.join([f"{expression} AS {column}" for column, expression in columns.items()] +
+                       [f"{expression} AS _key_{i}" for i, expression in enumerate(order)])
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+    page_sql = (f"SELECT {select} {from_sql}{where} "
+                f"ORDER BY {', '.join(f'{expression} {direction}' for expression in order)} "
+                f"LIMIT :page_size OFFSET :page_offset")
+    bind.update(page_size=page_size, page_offset=offset)
+    rows = connection.execute(text(page_sql), bind).mappings().all()
+
+    records = [{column: _jsonable(row[column]) for column in columns} for row in rows]
+    if len(rows) == page_size:
+        state['cursors'][str(page_current + 1)] = [_jsonable(rows[-1][f"_key_{i}"]) for i in range(len(order))]
+    page_count = max(1, -(-state['total'] // page_size))
+    return records, page_count, state
+
+
+def _coerce(series, value):
+    # The filter value as the column's type, or None when it cannot be compared (e.g. {Year} > abc)
+    if pd.api.types.is_numeric_dtype(series):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if pd.api.types.is_datetime64_any_dtype(series):
+        try:
+            return pd.Timestamp(value)
+        except (TypeError, ValueError):
+            return None
+    return str(value)
+
+
+def sort_and_filter_frame(df, sort_by=None, filter_query=''):
+    """Apply DataTable sorting and filtering to an in-memory DataFrame whose columns are the column ids.
+
+    Comparison filters whose value does not match the column's type are ignored.
+    """
+    for column, operator, value in parse_filter(filter_query):
+        if column not in df.columns:
+            continue
+        if operator == 'contains':
+            df = df[df[column].astype(str).str.contains(str(value), case=False, regex=False)]
+        elif operator == 'datestartswith':
+            df = df[df[column].astype(str).str.startswith(str(value))]
+        else:
+            value = _coerce(df[column], value)
+            if value is None:
+                continue
+            try:
+                df = df.loc[getattr(df[column], operator)(value)]
+            except TypeError:
+                continue
+    for sort in (sort_by or [])[:1]:
+        if sort['column_id'] in df.columns:
+            df = df.sort_values(sort['column_id'], ascending=sort['direction'] == 'asc', kind='stable')
+    return df
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from services import result_cache
+from services.keyword_score_service import SCORE_TABLE
+from services.mysql_service import mysql_engine, require_table
+from sqlalchemy import bindparam, text
+
+# University x keyword score matrix built from the university_keyword_score rollup (see
+# keyword_score_service), kept in memory as a sparse matrix with L2-normalised rows so cosine
+# similarity between universities is a sparse dot product. The matrix is loaded once and then kept
+# current incrementally: when the shared 'faculty_keywords' data version changes (bumped by the
+# rollup refreshes, in any process on the host) or REFRESH_SECONDS have passed since the last
+# check, per-university (row count, score sum) checksums identify the universities whose rollup
+# rows changed, and only those rows are re-read.
+CHECKSUM_QUERY = f"""
+    SELECT university_id, COUNT(*) AS keyword_count, SUM(total_score) AS score_sum
+    FROM {SCORE_TABLE}
+    GROUP BY university_id
+"""
+
+ROWS_QUERY = text(f"""
+    SELECT university_id, keyword_id, total_score
+    FROM {SCORE_TABLE}
+    WHERE university_id IN :ids
+""").bindparams(bindparam('ids', expanding=True))
+
+ALL_ROWS_QUERY = f"SELECT university_id, keyword_id, total_score FROM {SCORE_TABLE}"
+
+DEFAULT_TOP_K = 10
+# Re-check the checksums at least this often, for rollup changes whose version bump this process
+# cannot see (e.g. a refresh run on another host)
+REFRESH_SECONDS = 600
+
+
+class UniversityKeywordMatrix:
+    """Sparse, row-normalised university x keyword score matrix."""
+
+    def __init__(self):
+        self.keyword_ids = []
+        self._column_of = {}
+        self._rows = {}
+        self._checksums = {}
+        # (university ids, {university id: row}, normalised matrix), swapped in as one tuple so
+        # readers never see the parts of two different builds
+        self._index = ([], {}, sp.csr_matrix((0, 0)))
+
+    def _set_rows(self, rows):
+        changed = {}
+        for university_id, keyword_id, score in rows:
+            changed.setdefault(university_id, {})[keyword_id] = float(score)
+        for university_id, scores in changed.items():
+            self._rows[university_id] = scores
+            for keyword_id in scores:
+                if keyword_id not in self._column_of:
+                    self._column_of[keyword_id] = len(self.keyword_ids)
+                    self.keyword_ids.append(keyword_id)
+        return changed
+
+    def _build(self):
+        # Only changed rows are re-read from MySQL; the matrix is reassembled from the cached rows
+        university_ids = sorted(self._rows)
+        row_of = {university_id: i for i, university_id in enumerate(university_ids)}
+        row_index, column_index, values = [], [], []
+        for university_id in university_ids:
+            scores = self._rows[university_id]
+            row_index.extend([row_of[university_id]] * len(scores))
+            column_index.extend(self._column_of[keyword_id] for keyword_id in scores)
+            values.extend(scores.values())
+        matrix = sp.csr_matrix((np.asarray(values, dtype=np.float64), (row_index, column_index)),
+                               shape=(len(university_ids), len(self.keyword_ids)))
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        self._index = (university_ids, row_of, sp.csr_matrix(sp.diags(1.0 / norms) @ matrix))
+
+    def load(self, connection):
+        """Read the whole rollup."""
+        self._rows = {}
+        self._set_rows(connection.execute(text(ALL_ROWS_QUERY)).fetchall())
+        self._checksums = {row.university_id: (row.keyword_count, float(row.score_sum))
+                           for row in connection.execute(text(CHECKSUM_QUERY))}
+        self._build()
+
+    def refresh(self, connection):
+        """Re-read only the universities whose rollup rows changed; returns their ids."""
+        checksums = {row.university_id: (row.keyword_count, float(row.score_sum))
+                     for row in connection.execute(text(CHECKSUM_QUERY))}
+        changed = [university_id for university_id, checksum in checksums.items()
+                   if not np.allclose(self._checksums.get(university_id, (-1, 0.0)), checksum)]
+        removed = set(self._checksums) - set(checksums)
+        if not changed and not removed:
+            return []
+        for university_id in list(removed) + changed:
+            self._rows.pop(university_id, None)
+        if changed:
+            self._set_rows(connection.execute(ROWS_QUERY, {"ids": changed}).fetchall())
+        self._checksums = checksums
+        self._build()
+        return changed + list(removed)
+
+    def similar(self, university_id, k=DEFAULT_TOP_K):
+        """``[(university_id, cosine similarity)]`` of the ``k`` universities most similar to ``university_id``."""
+        university_ids, row_of, normalized = self._index
+        row = row_of.get(university_id)
+        if row is None:
+            return []
+        scores = (normalized @ normalized[row].T).toarray().ravel()
+        scores[row] = -np.inf
+        k = min(k, len(scores) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(university_ids[i], float(scores[i])) for i in top]
+
+    def similarity_matrix(self, university_ids):
+        """Dense pairwise cosine similarities of ``university_ids``; unknown ids are skipped.
+
+        Returns ``(ids, matrix)``, with ``ids`` in the order of the matrix rows.
+        """
+        _, row_of, normalized = self._index
+        ids = [university_id for university_id in university_ids if university_id in row_of]
+        rows = normalized[[row_of[university_id] for university_id in ids]]
+        return ids, (rows @ rows.T).toarray()
+
+
+_lock = threading.Lock()
+_matrix = None
+_loaded_version = None
+_checked_at = 0.0
+
+
+def get_matrix():
+    """The shared matrix, loaded on first use and refreshed on a data version change or every REFRESH_SECONDS."""
+    global _matrix, _loaded_version, _checked_at
+    version = result_cache.backend.get_version('faculty_keywords')
+    with _lock:
+        if _matrix is None or version != _loaded_version or time.time() - _checked_at >= REFRESH_SECONDS:
+            with mysql_engine.connect() as connection, require_table(SCORE_TABLE):
+                if _matrix is None:
+                    matrix = UniversityKeywordMatrix()
+                    matrix.load(connection)
+                    _matrix = matrix
+                else:
+                    _matrix.refresh(connection)
+            _loaded_version = version
+            _checked_at = time.time()
+        return _matrix
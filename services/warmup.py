@@ -0,0 +1,45 @@
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Reference data that used to be queried at import time (dropdown option lists) is registered here
+# instead. start() loads everything concurrently in the background once the app is up, and get()
+# returns the loaded value, running the loader on demand if warm-up hasn't reached it yet. A failed
+# load is retried on the next get(), so a backend that is down at startup doesn't break the app.
+MAX_WORKERS = 4
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='warmup')
+_lock = threading.Lock()
+_loaders = {}
+_futures = {}
+
+
+def register(name, loader):
+    """Register a zero-argument ``loader`` whose result is served by get(name)."""
+    _loaders[name] = loader
+
+
+def _submit(name):
+    with _lock:
+        future = _futures.get(name)
+        if future is None or (future.done() and future.exception() is not None):
+            future = _executor.submit(_loaders[name])
+            _futures[name] = future
+        return future
+
+
+def start():
+    """Begin loading every registered value concurrently without blocking the caller."""
+    for name in list(_loaders):
+        _submit(name)
+
+
+def get(name, timeout=None):
+    """Return the loaded value for ``name``, waiting for (or starting) its load if needed."""
+    return _submit(name).result(timeout)
+
+
+def invalidate(name):
+    """Drop a loaded value so the next get() reloads it."""
+    with _lock:
+        _futures.pop(name, None)
@@ -0,0 +1,83 @@
+import os
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from config.neo4j_config import NEO4J_USERNAME, NEO4J_PASSWORD, NEO4J_DB_NAME
+from services import neo4j_schema
+
+# EXPLAIN plans as the driver returns them in ResultSummary.plan
+SCAN_PLAN = {
+    'operatorType': 'ProduceResults@neo4j',
+    'children': [{
+        'operatorType': 'Filter@neo4j',
+        'children': [{'operatorType': 'NodeByLabelScan@neo4j', 'children': []}],
+    }],
+}
+SEEK_PLAN = {
+    'operatorType': 'ProduceResults@neo4j',
+    'children': [{
+        'operatorType': 'Expand(All)@neo4j',
+        'children': [{'operatorType': 'NodeIndexSeek@neo4j', 'children': []}],
+    }],
+}
+
+
+def fake_session(plans):
+    """Stand-in for neo4j_service.neo4j_session that answers ``EXPLAIN <query>`` from ``plans``."""
+    class Session:
+        def run(self, query, params=None):
+            plan = plans[query[len('EXPLAIN '):]]
+            return SimpleNamespace(consume=lambda: SimpleNamespace(plan=plan))
+
+    @contextmanager
+    def session():
+        yield Session()
+    return session
+
+
+def test_plan_operators_walks_children_and_drops_runtime_suffix():
+    assert list(neo4j_schema._plan_operators(SCAN_PLAN)) == ['ProduceResults', 'Filter', 'NodeByLabelScan']
+    assert set(neo4j_schema._plan_operators(SEEK_PLAN)) == {'ProduceResults', 'Expand(All)', 'NodeIndexSeek'}
+
+
+def test_hot_query_with_label_scan_is_flagged(monkeypatch):
+    monkeypatch.setattr(neo4j_schema, 'neo4j_session', fake_session({'scan': SCAN_PLAN, 'seek': SEEK_PLAN}))
+    monkeypatch.setattr(neo4j_schema, 'REGISTERED_QUERIES', {'by_seek': ('seek', {}, True),
+                                                             'by_scan': ('scan', {}, True)})
+    with pytest.raises(neo4j_schema.QueryPlanError, match='by_scan: NodeByLabelScan') as error:
+        neo4j_schema.check_query_plans()
+    assert 'by_seek' not in str(error.value)
+
+
+def test_index_seek_and_cold_scans_pass(monkeypatch):
+    monkeypatch.setattr(neo4j_schema, 'neo4j_session', fake_session({'scan': SCAN_PLAN, 'seek': SEEK_PLAN}))
+    monkeypatch.setattr(neo4j_schema, 'REGISTERED_QUERIES', {'by_seek': ('seek', {}, True),
+                                                             'refresh': ('scan', {}, False)})
+    plans = neo4j_schema.check_query_plans()
+    assert 'NodeIndexSeek' in plans['by_seek']
+    assert 'NodeByLabelScan' in plans['refresh']
+
+
+@pytest.mark.skipif(not os.environ.get('NEO4J_URI'), reason='set NEO4J_URI to run against a Neo4j server')
+def test_registered_queries_against_server(monkeypatch):
+    """Plans every registered query on a real server; run `python manage.py init` against it first."""
+    from neo4j import GraphDatabase
+
+    driver = GraphDatabase.driver(os.environ['NEO4J_URI'],
+                                  auth=(os.environ.get('NEO4J_USERNAME', NEO4J_USERNAME),
+                                        os.environ.get('NEO4J_PASSWORD', NEO4J_PASSWORD)))
+
+    @contextmanager
+    def session():
+        with driver.session(database=os.environ.get('NEO4J_DATABASE', NEO4J_DB_NAME)) as s:
+            yield s
+
+    monkeypatch.setattr(neo4j_schema, 'neo4j_session', session)
+    try:
+        plans = neo4j_schema.check_query_plans()
+    finally:
+        driver.close()
+    assert set(plans) == set(neo4j_schema.REGISTERED_QUERIES)
@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from services import photo_service
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers HEAD requests like the hosts serving faculty photos can."""
+
+    def do_HEAD(self):
+        if self.path == '/photo.jpg':
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+        elif self.path == '/profile.html':
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+        elif self.path == '/slow.jpg':
+            time.sleep(1)
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+        else:
+            self.send_response(404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session():
+    with requests.Session() as session:
+        yield session
+
+
+def test_image_is_valid(stub_server, session):
+    assert photo_service.check_image_url(f'{stub_server}/photo.jpg', session) == (
+        True, photo_service.VALID_TTL_SECONDS)
+
+
+def test_html_page_is_invalid(stub_server, session):
+    assert photo_service.check_image_url(f'{stub_server}/profile.html', session) == (
+        False, photo_service.INVALID_TTL_SECONDS)
+
+
+def test_missing_image_is_invalid(stub_server, session):
+    assert photo_service.check_image_url(f'{stub_server}/missing.jpg', session) == (
+        False, photo_service.INVALID_TTL_SECONDS)
+
+
+def test_timeout_is_an_error(stub_server, session, monkeypatch):
+    monkeypatch.setattr(photo_service, 'REQUEST_TIMEOUT_SECONDS', 0.2)
+    assert photo_service.check_image_url(f'{stub_server}/slow.jpg', session) == (
+        False, photo_service.ERROR_TTL_SECONDS)